@@ -0,0 +1,3 @@
+from .base import NotesCache
+from .lru import LRUCache
+from .notes import notes_cache, note_key, COUNT_KEY
\ No newline at end of file
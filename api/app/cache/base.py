@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Hashable, Optional
+
+
+class NotesCache(ABC):
+    """Interface of the cache around NotesService reads.
+
+    The in-process LRUCache implements it; a shared cache (e.g. Redis) can
+    implement the same methods to be used by several API workers.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value, None on miss or expiry."""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """Counter bumped by every invalidation; read it before loading a value to cache."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Store a value.
+
+        With `generation`, the value is dropped if anything was invalidated since
+        that generation was read, so a row loaded before a concurrent write is
+        never stored after that write's invalidation.
+        """
+
+    @abstractmethod
+    def delete(self, *keys: Hashable) -> None:
+        """Invalidate keys."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Invalidate everything."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Counters: hits, misses, evictions, expirations, stale_fills, size."""
@@ -0,0 +1,22 @@
+import os
+from typing import Hashable
+from .base import NotesCache
+from .lru import LRUCache
+
+COUNT_KEY: Hashable = ("notes_count",)
+
+
+def note_key(note_id: int) -> Hashable:
+    """Cache key of a single note."""
+    return ("note", note_id)
+
+
+def create_notes_cache() -> NotesCache:
+    """Build the cache from NOTES_CACHE_* environment variables."""
+    return LRUCache(
+        max_size=int(os.getenv("NOTES_CACHE_MAX_SIZE", "10000")),
+        ttl=float(os.getenv("NOTES_CACHE_TTL", "30")),
+    )
+
+
+notes_cache = create_notes_cache()
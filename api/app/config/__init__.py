@@ -1 +1 @@
-from .database import SessionLocal, Base, engine
\ No newline at end of file
+from .database import SessionLocal, AsyncSessionLocal, Base, engine, async_engine
\ No newline at end of file
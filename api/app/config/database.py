@@ -1,20 +1,40 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
-POSTGRES_SERVICE_NAME=os.getenv("POSTGRES_SERVICE_NAME")
-if not DB_USER or not DB_PASSWORD or not DB_NAME or not POSTGRES_SERVICE_NAME:
-    raise ValueError("Values were not passed to .env")
+# Full async URL (e.g. sqlite+aiosqlite:///notes.db) instead of the DB_* values.
+# The sync engine uses the same database with the dialect's default driver.
+DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(f"postgresql://{DB_USER}:{DB_PASSWORD}@{POSTGRES_SERVICE_NAME}:5432/{DB_NAME}")
+if DATABASE_URL:
+    async_url = make_url(DATABASE_URL)
+    sync_url = async_url.set(drivername=async_url.get_backend_name())
+else:
+    DB_USER = os.getenv("DB_USER")
+    DB_PASSWORD = os.getenv("DB_PASSWORD")
+    DB_NAME = os.getenv("DB_NAME")
+    POSTGRES_SERVICE_NAME=os.getenv("POSTGRES_SERVICE_NAME")
+    if not DB_USER or not DB_PASSWORD or not DB_NAME or not POSTGRES_SERVICE_NAME:
+        raise ValueError("Values were not passed to .env")
+    sync_url = f"postgresql://{DB_USER}:{DB_PASSWORD}@{POSTGRES_SERVICE_NAME}:5432/{DB_NAME}"
+    async_url = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{POSTGRES_SERVICE_NAME}:5432/{DB_NAME}"
+
+engine = create_engine(sync_url)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
-Base = declarative_base()
\ No newline at end of file
+# SQLite pools take no size options.
+pool_options = {} if engine.dialect.name == "sqlite" else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+}
+async_engine = create_async_engine(async_url, pool_pre_ping=True, **pool_options)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
@@ -1 +1 @@
-from .database import get_db
\ No newline at end of file
+from .database import get_db, get_async_db
\ No newline at end of file
@@ -1,5 +1,8 @@
+from typing import AsyncIterator
 from sqlalchemy.orm import Session
-from ..config import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import SessionLocal, AsyncSessionLocal
+from ..metrics import checkout_connection
 
 def get_db() -> Session:
     """get Session."""
@@ -8,3 +11,10 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """get AsyncSession with its connection checked out (the wait is recorded)."""
+    async with AsyncSessionLocal() as db:
+        await checkout_connection(db, "async")
+        yield db
@@ -1,7 +1,13 @@
+import os
 from fastapi import FastAPI
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from .routers import router
-from .config import engine
-from .models import Base
+from .config import engine, async_engine
+from .metrics import MetricsMiddleware, instrument_engine
+from .migrations import get_pending_migrations, apply_migrations
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
 
 app = FastAPI(
     title="Notes API",
@@ -10,12 +16,30 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc"
 )
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine, "async")
 
 @app.on_event("startup")
 async def startup_event():
-    """Create tables."""
-    Base.metadata.create_all(bind=engine)
-    print("Tables were created!")
+    """Check schema version, apply pending migrations if AUTO_MIGRATE is enabled."""
+    async with async_engine.connect() as conn:
+        pending = await conn.run_sync(get_pending_migrations)
+    if not pending:
+        return
+    if not AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is behind by {len(pending)} migration(s). Run `python -m app.migrations`"
+        )
+    async with async_engine.connect() as conn:
+        applied = await conn.run_sync(apply_migrations)
+    print(f"Migrations were applied: {applied}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async connections."""
+    await async_engine.dispose()
 
 
 app.include_router(router, prefix="/api/v1")
@@ -27,4 +51,9 @@ async def root():
         "message": "Notes API is running",
         "version": "1.0.0",
         "docs": "/docs"
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: route latency, SQL statement timings, pool connections"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
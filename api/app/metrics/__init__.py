@@ -0,0 +1,2 @@
+from .http import MetricsMiddleware
+from .database import instrument_engine, checkout_connection
\ No newline at end of file
@@ -0,0 +1,108 @@
+import time
+from typing import Union
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing one SQL statement (cursor execute to result)",
+    ["engine", "operation"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_CONNECT_DURATION = Histogram(
+    "db_pool_connect_duration_seconds",
+    "Time to open a new DBAPI connection for the pool",
+    ["engine"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a session waits for its connection, including waiting for a free one in the pool",
+    ["engine"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_HELD_DURATION = Histogram(
+    "db_pool_connection_held_seconds",
+    "Time a connection stays checked out of the pool (checkout to checkin)",
+    ["engine"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["engine"],
+)
+
+_instrumented = set()
+
+
+def _operation(statement: str) -> str:
+    """First SQL keyword (SELECT, INSERT, ...) to keep the label set small."""
+    keyword = statement.lstrip().split(None, 1)
+    return keyword[0].upper() if keyword else "UNKNOWN"
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine], name: str) -> None:
+    """Record statement timings and pool activity of `engine` under label `name`.
+
+    Uses engine and pool events only; the wait for a connection is recorded by
+    checkout_connection. Safe to call more than once; pool listeners carry over
+    to the pool that engine.dispose() creates.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if sync_engine in _instrumented:
+        return
+    _instrumented.add(sync_engine)
+
+    # Statements on one connection never overlap, so a single slot is enough.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["statement_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("statement_started", None)
+        if started is not None:
+            DB_STATEMENT_DURATION.labels(name, _operation(statement)).observe(time.perf_counter() - started)
+
+    # A new connection: from the dialect's connect call to the pool's connect event.
+    @event.listens_for(sync_engine, "do_connect")
+    def do_connect(dialect, connection_record, cargs, cparams):
+        connection_record.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        started = connection_record.info.pop("connect_started", None)
+        if started is not None:
+            DB_POOL_CONNECT_DURATION.labels(name).observe(time.perf_counter() - started)
+
+    # record_info outlives an invalidated connection, so every checkout is checked in.
+    @event.listens_for(sync_engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.record_info["checked_out_at"] = time.perf_counter()
+        DB_POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.record_info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            DB_POOL_HELD_DURATION.labels(name).observe(time.perf_counter() - checked_out_at)
+            DB_POOL_CHECKED_OUT.labels(name).dec()
+
+
+async def checkout_connection(db: AsyncSession, name: str) -> None:
+    """Get `db`'s connection now and record how long that took under label `name`.
+
+    The pool has no event before a checkout, so the wait is timed around the
+    session's first connection() call. Failed checkouts (pool timeouts) are recorded too.
+    """
+    started = time.perf_counter()
+    try:
+        await db.connection()
+    finally:
+        DB_POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - started)
@@ -0,0 +1,52 @@
+import time
+
+from prometheus_client import Gauge, Histogram
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of the response",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records per-route latency.
+
+    The route label is the path template (`/api/v1/notes/{note_id}`), taken from
+    the route FastAPI matched, so ids do not create new series. Requests that
+    match no route are recorded as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - started)
+            in_progress.dec()
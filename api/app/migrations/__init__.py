@@ -0,0 +1 @@
+from .runner import MIGRATIONS, get_current_version, get_pending_migrations, apply_migrations
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""Apply pending migrations: `python -m app.migrations` from the api directory."""
+from ..config import engine
+from .runner import apply_migrations, get_current_version
+
+if __name__ == "__main__":
+    with engine.connect() as conn:
+        applied = apply_migrations(conn)
+        print(f"Applied migrations: {applied or 'none'}. Schema version: {get_current_version(conn)}")
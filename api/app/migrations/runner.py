@@ -0,0 +1,45 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from typing import List
+from .versions import MIGRATIONS
+
+MIGRATIONS_TABLE = "schema_migrations"
+# Arbitrary key for pg_advisory_xact_lock, so parallel workers do not migrate twice.
+MIGRATIONS_LOCK_KEY = 52520001
+
+
+def get_current_version(conn: Connection) -> int:
+    """Get the applied schema version (0 for an empty database)."""
+    if not inspect(conn).has_table(MIGRATIONS_TABLE):
+        return 0
+    version = conn.execute(text(f"SELECT max(version) FROM {MIGRATIONS_TABLE}")).scalar()
+    return version or 0
+
+
+def get_pending_migrations(conn: Connection) -> List:
+    """Get migrations newer than the applied version."""
+    current = get_current_version(conn)
+    return [migration for migration in MIGRATIONS if migration.VERSION > current]
+
+
+def apply_migrations(conn: Connection) -> List[int]:
+    """Apply pending migrations in one transaction. Returns applied versions."""
+    applied = []
+    with conn.begin():
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                version INTEGER PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        for migration in get_pending_migrations(conn):
+            migration.upgrade(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES (:version, :description)"),
+                {"version": migration.VERSION, "description": migration.DESCRIPTION}
+            )
+            applied.append(migration.VERSION)
+    return applied
@@ -0,0 +1,21 @@
+"""Ordered list of schema migrations.
+
+Each module exposes VERSION (int), DESCRIPTION (str) and upgrade(conn).
+"""
+from . import (
+    m0001_create_notes_main,
+    m0002_status_indexes,
+    m0003_status_counts,
+    m0004_search_vector,
+    m0005_notes_revision,
+    m0006_name_indexes,
+)
+
+MIGRATIONS = [
+    m0001_create_notes_main,
+    m0002_status_indexes,
+    m0003_status_counts,
+    m0004_search_vector,
+    m0005_notes_revision,
+    m0006_name_indexes,
+]
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 1
+DESCRIPTION = "Create notes_main"
+
+
+def upgrade(conn: Connection) -> None:
+    """Create the notes table (no-op for databases created by create_all)."""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS notes_main (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            comment TEXT,
+            status VARCHAR(20) NOT NULL,
+            CONSTRAINT check_status_values CHECK (status IN ('done', 'in_progress', 'not_activate'))
+        )
+    """))
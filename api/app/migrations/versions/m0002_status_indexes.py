@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 2
+DESCRIPTION = "Indexes for status filter and id ordering"
+
+STATUSES = ("done", "in_progress", "not_activate")
+
+
+def upgrade(conn: Connection) -> None:
+    """Composite (status, id) index plus one partial index per status."""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notes_main_status_id ON notes_main (status, id)"
+    ))
+    for status in STATUSES:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_notes_main_{status}_id "
+            f"ON notes_main (id) WHERE status = '{status}'"
+        ))
@@ -0,0 +1,81 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+DESCRIPTION = "Per-status counters maintained by triggers"
+
+STATUSES = ("done", "in_progress", "not_activate")
+
+
+def upgrade(conn: Connection) -> None:
+    """Counter table kept in sync by statement-level triggers on notes_main.
+
+    Triggers use transition tables, so a multi-row INSERT/UPDATE/DELETE or COPY
+    touches each counter row once per statement, in the same transaction.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS notes_status_counts (
+            status VARCHAR(20) PRIMARY KEY,
+            count BIGINT NOT NULL DEFAULT 0
+        )
+    """))
+    # Block writers while seeding so no change slips between the count and the triggers.
+    conn.execute(text("LOCK TABLE notes_main IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(text("DELETE FROM notes_status_counts"))
+    for status in STATUSES:
+        conn.execute(
+            text("""
+                INSERT INTO notes_status_counts (status, count)
+                SELECT :status, count(*) FROM notes_main WHERE status = :status
+            """),
+            {"status": status}
+        )
+    conn.execute(text("""
+        CREATE OR REPLACE FUNCTION notes_status_counts_refresh() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE notes_status_counts SET count = 0;
+            ELSIF TG_OP = 'INSERT' THEN
+                UPDATE notes_status_counts c SET count = c.count + d.delta
+                FROM (SELECT status, count(*) AS delta FROM new_rows GROUP BY status) d
+                WHERE c.status = d.status;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE notes_status_counts c SET count = c.count - d.delta
+                FROM (SELECT status, count(*) AS delta FROM old_rows GROUP BY status) d
+                WHERE c.status = d.status;
+            ELSE
+                UPDATE notes_status_counts c SET count = c.count + d.delta
+                FROM (
+                    SELECT status, sum(delta) AS delta FROM (
+                        SELECT status, 1 AS delta FROM new_rows
+                        UNION ALL
+                        SELECT status, -1 AS delta FROM old_rows
+                    ) changes
+                    GROUP BY status
+                ) d
+                WHERE c.status = d.status AND d.delta <> 0;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER notes_status_counts_insert
+        AFTER INSERT ON notes_main REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notes_status_counts_refresh()
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER notes_status_counts_update
+        AFTER UPDATE ON notes_main REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notes_status_counts_refresh()
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER notes_status_counts_delete
+        AFTER DELETE ON notes_main REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notes_status_counts_refresh()
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER notes_status_counts_truncate
+        AFTER TRUNCATE ON notes_main
+        FOR EACH STATEMENT EXECUTE FUNCTION notes_status_counts_refresh()
+    """))
@@ -0,0 +1,25 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 4
+DESCRIPTION = "Full-text search column with a GIN index"
+
+# Pinned on purpose instead of importing app.models.SEARCH_CONFIG: an applied migration must
+# not change. Switching configurations takes a new migration, then the constant in app.models.
+# The russian configuration stems latin words with the english stemmer as well.
+SEARCH_CONFIG = "russian"
+
+
+def upgrade(conn: Connection) -> None:
+    """Stored tsvector over name (A), description (B), comment (C) and its GIN index."""
+    conn.execute(text(f"""
+        ALTER TABLE notes_main ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(comment, '')), 'C')
+        ) STORED
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notes_main_search_vector ON notes_main USING GIN (search_vector)"
+    ))
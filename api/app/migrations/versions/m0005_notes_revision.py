@@ -0,0 +1,29 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 5
+DESCRIPTION = "Table-level change counter for ETags"
+
+
+def upgrade(conn: Connection) -> None:
+    """Single-row revision bumped by a statement-level trigger on every write to notes_main."""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS notes_revision (
+            id SMALLINT PRIMARY KEY CHECK (id = 1),
+            revision BIGINT NOT NULL
+        )
+    """))
+    conn.execute(text("INSERT INTO notes_revision (id, revision) VALUES (1, 1) ON CONFLICT (id) DO NOTHING"))
+    conn.execute(text("""
+        CREATE OR REPLACE FUNCTION notes_revision_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE notes_revision SET revision = revision + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text("""
+        CREATE TRIGGER notes_revision_bump
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON notes_main
+        FOR EACH STATEMENT EXECUTE FUNCTION notes_revision_bump()
+    """))
@@ -0,0 +1,16 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 6
+DESCRIPTION = "Indexes for name prefix filter and name ordering"
+
+
+def upgrade(conn: Connection) -> None:
+    """text_pattern_ops index for LIKE 'prefix%', (name, id) index for sort=name keyset pages."""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notes_main_name_pattern "
+        "ON notes_main (name text_pattern_ops)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notes_main_name_id ON notes_main (name, id)"
+    ))
@@ -1 +1 @@
-from .models import NotesMain, Base
\ No newline at end of file
+from .models import NotesMain, NotesStatusCount, NotesRevision, Base, SEARCH_CONFIG
\ No newline at end of file
@@ -1,8 +1,12 @@
-from sqlalchemy import String, Integer, Column, Text, CheckConstraint
+from sqlalchemy import String, Integer, SmallInteger, BigInteger, Column, Text, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import ENUM
 from ..config import Base
 import enum
 
+# Text search configuration of notes_main.search_vector; queries must use the same one.
+# Migration 4 pins its own copy: changing this needs a new migration that rebuilds the column.
+SEARCH_CONFIG = "russian"
+
 class NotesMain(Base):
     __tablename__ = "notes_main"
 
@@ -17,4 +21,29 @@ class NotesMain(Base):
             "status IN ('done', 'in_progress', 'not_activate')",
             name='check_status_values'
         ),
-    )
\ No newline at end of file
+        # Created by migrations (see app/migrations), declared here to keep metadata in sync.
+        Index("ix_notes_main_status_id", "status", "id"),
+        Index("ix_notes_main_done_id", "id", postgresql_where=text("status = 'done'")),
+        Index("ix_notes_main_in_progress_id", "id", postgresql_where=text("status = 'in_progress'")),
+        Index("ix_notes_main_not_activate_id", "id", postgresql_where=text("status = 'not_activate'")),
+        Index("ix_notes_main_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        Index("ix_notes_main_name_id", "name", "id"),
+    )
+    # search_vector (generated tsvector) and its GIN index are added by migration 4.
+    # The column is not mapped, so regular queries do not load it.
+
+
+class NotesStatusCount(Base):
+    """Number of notes per status, maintained by triggers on notes_main (migration 3)."""
+    __tablename__ = "notes_status_counts"
+
+    status = Column(String(20), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class NotesRevision(Base):
+    """Single-row change counter of notes_main, bumped by a trigger (migration 5)."""
+    __tablename__ = "notes_revision"
+
+    id = Column(SmallInteger, primary_key=True)
+    revision = Column(BigInteger, nullable=False)
@@ -1,10 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Optional, Union
+
+from ..schemas import (
+    ExportFormat, NoteCreate, NoteUpdate, NoteResponse, NotesPage, NotesStats, NoteSearchResult, StatusType,
+    NotesListParams, NotesSearchParams,
+    NotesBatchCreate, NotesBatchUpdate, NotesBatchDelete,
+    BatchResult, ImportSummary, NotesLookup, NotesLookupResult,
+    NOTE_COLUMNS, FIELDS_DESCRIPTION, parse_fields, dump_notes_lookup,
+)
+from ..services import (
+    AsyncNotesService, ndjson_chunks, csv_chunks,
+    ndjson_records, csv_records, validated_chunks, make_etag, etag_matches,
+    not_found_detail, list_notes, stats_result, created_result, updated_result, deleted_result,
+)
+from ..config import AsyncSessionLocal
+from ..dependencies import get_async_db
+from ..cache import notes_cache
+from ..metrics import checkout_connection
+
+
+def fields_or_422(fields: Optional[str]) -> tuple:
+    """Parse the `fields` projection, invalid names are a validation error."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+def etag_headers(etag: str) -> dict:
+    """Headers for conditional GET: clients must revalidate with If-None-Match."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response, nothing is queried or serialized beyond the revision."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
 
-from ..schemas import NoteCreate, NoteUpdate, NoteResponse, StatusType
-from ..services import NotesService
-from ..dependencies import get_db
 
 router = APIRouter(
     prefix="/notes",
@@ -18,7 +54,7 @@ router = APIRouter(
 @router.post("/", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
 async def create_note(
     note: NoteCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new note.
@@ -29,8 +65,8 @@ async def create_note(
     - **status**: Note's status (by deffault: in_progress)
     """
     try:
-        service = NotesService(db)
-        db_note = service.create_note(note)
+        service = AsyncNotesService(db)
+        db_note = await service.create_note(note)
         return db_note
     except Exception as e:
         raise HTTPException(
@@ -38,55 +74,244 @@ async def create_note(
             detail=f"Error when creating a note: {str(e)}"
         )
 
-@router.get("/", response_model=List[NoteResponse])
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_notes_batch(
+    batch: NotesBatchCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create several notes in one transaction.
+
+    - **items**: List of notes (1-1000), same fields as for creating one note
+    """
+    try:
+        service = AsyncNotesService(db)
+        notes = await service.create_notes(batch.items)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error when creating notes: {str(e)}"
+        )
+    return created_result(notes)
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_notes_batch(
+    batch: NotesBatchUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Update several notes in one transaction.
+
+    - **items**: List of updates (1-1000), each with **id** and the fields to change
+    """
+    service = AsyncNotesService(db)
+    updated = await service.update_notes(batch.items)
+    return updated_result(batch.items, updated)
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_notes_batch(
+    batch: NotesBatchDelete,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete several notes in one transaction.
+
+    - **ids**: List of note identifiers (1-1000)
+    """
+    service = AsyncNotesService(db)
+    deleted = await service.delete_notes(batch.ids)
+    return deleted_result(batch.ids, deleted)
+
+@router.post("/import", response_model=ImportSummary)
+async def import_notes(
+    request: Request,
+    import_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson or csv"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk import notes from a streamed NDJSON or CSV body.
+
+    - **format**: ndjson (one note object per line) or csv (header row with name, description, comment, status)
+
+    Rows are validated like a single created note; invalid rows are skipped and reported.
+    An `id` field/column is ignored, so an export can be imported back.
+    """
+    summary = ImportSummary()
+    parse = csv_records if import_format == ExportFormat.CSV else ndjson_records
+    service = AsyncNotesService(db)
+    try:
+        await service.import_notes(validated_chunks(parse(request.stream()), summary))
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Body is not valid UTF-8: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error when importing notes: {str(e)}"
+        )
+    return summary
+
+@router.post("/lookup", response_model=NotesLookupResult)
+async def lookup_notes(
+    lookup: NotesLookup,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get several notes by id in one query.
+
+    - **ids**: List of note identifiers (1-1000)
+    - **fields**: Only select and return these columns, e.g. `name,status`
+
+    Found notes come back in request order; ids that do not exist are listed in `missing`.
+    """
+    columns = fields_or_422(fields)
+    service = AsyncNotesService(db)
+    notes, missing = await service.get_notes_by_ids(lookup.ids, columns)
+    return Response(content=dump_notes_lookup(notes, missing), media_type="application/json")
+
+@router.get("/", response_model=Union[List[NoteResponse], NotesPage])
 async def get_notes(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
-    status_filter: Optional[StatusType] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db)
+    params: Annotated[NotesListParams, Query()],
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of notes with pagination.
 
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records (1-1000)
+    - **status_filter**: Filter by note status, e.g. `?status_filter=done&status_filter=in_progress`
+    - **name_prefix**: Filter by the beginning of the name (case-sensitive)
+    - **sort**, **order**: Ordering (`id`, `name` or `status`; ties are broken by id)
+    - **cursor**: Switches to keyset pagination. Pass an empty value for the first page,
+      then the returned `next_cursor` until it is null. `skip` is ignored in this mode,
+      and the cursor is only valid with the same `sort` and `order`.
+    - **fields**: Only select and return these columns, e.g. `name,status`
+
+    Rows are serialized straight to JSON bytes; response_model only documents the shape.
+    Supports If-None-Match with the returned ETag.
+    """
+    columns = fields_or_422(params.fields)
+    service = AsyncNotesService(db)
+    # Read the revision before the data: a concurrent write can only make the ETag older.
+    etag = make_etag(await service.get_revision())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        content = await list_notes(service, params, columns)
+    except ValueError as e:
+        # Only the cursor is parsed past validation.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(content=content, media_type="application/json", headers=etag_headers(etag))
+
+@router.get("/stats", response_model=NotesStats)
+async def get_notes_stats(
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get total count of notes and count per status.
+    """
+    service = AsyncNotesService(db)
+    return stats_result(await service.get_notes_stats())
+
+@router.get("/search", response_model=List[NoteSearchResult])
+async def search_notes(
+    params: Annotated[NotesSearchParams, Query()],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over name, description and comment, best matches first.
+
+    - **q**: Search query. Supports "quoted phrases", OR and -excluded words
+    - **limit**: Maximum number of records (1-100)
     - **status_filter**: Filter by note status
     """
-    service = NotesService(db)
-    
-    if status_filter:
-        notes = service.get_notes_by_status(status_filter.value, skip, limit)
-    else:
-        notes = service.get_notes(skip, limit)
-    
-    return notes
+    service = AsyncNotesService(db)
+    status_value = params.status_filter.value if params.status_filter else None
+    return await service.search_notes(params.q, params.limit, status_value)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_notes(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson or csv"),
+    status_filter: Optional[StatusType] = Query(None, description="Filter by status"),
+):
+    """
+    Stream all notes ordered by id, without a size limit.
+
+    - **format**: ndjson (one JSON object per line) or csv (with a header row)
+    - **status_filter**: Filter by note status
+    """
+    status_value = status_filter.value if status_filter else None
+    encode = csv_chunks if export_format == ExportFormat.CSV else ndjson_chunks
+
+    async def generate():
+        # The session lives as long as the stream, not the request handler.
+        async with AsyncSessionLocal() as db:
+            await checkout_connection(db, "async")
+            service = AsyncNotesService(db)
+            async for chunk in encode(service.stream_notes(status_value)):
+                yield chunk
+
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=notes.{export_format.value}"}
+    )
 
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get note by ID.
 
     - **note_id**: Unique note identifier
+    - **fields**: Only return these columns, e.g. `name,status`
+
+    Supports If-None-Match with the returned ETag.
     """
-    service = NotesService(db)
-    db_note = service.get_note(note_id)
+    columns = fields_or_422(fields)
+    service = AsyncNotesService(db)
+    revision = await service.get_revision()
+    etag = make_etag(revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    # Only a cached note loaded at this revision is served under this ETag.
+    db_note = await service.get_note(note_id, revision)
     
     if not db_note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Note with ID {note_id} not found"
+            detail=not_found_detail(note_id)
         )
     
+    if columns != NOTE_COLUMNS:
+        # The full note is what the cache holds; project it on the way out.
+        return Response(
+            content=db_note.model_dump_json(include=set(columns)),
+            media_type="application/json",
+            headers=etag_headers(etag)
+        )
+    response.headers.update(etag_headers(etag))
     return db_note
 
 @router.put("/{note_id}", response_model=NoteResponse)
 async def update_note(
     note_id: int,
     note_update: NoteUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update note.
@@ -97,13 +322,13 @@ async def update_note(
     - **comment**: New note comment (optional)
     - **status**: New note status (optional)
     """
-    service = NotesService(db)
-    db_note = service.update_note(note_id, note_update)
+    service = AsyncNotesService(db)
+    db_note = await service.update_note(note_id, note_update)
     
     if not db_note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Note with ID {note_id} not found"
+            detail=not_found_detail(note_id)
         )
     
     return db_note
@@ -111,29 +336,45 @@ async def update_note(
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_note(
     note_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete note.
 
     - **note_id**: Unique note identifier
     """
-    service = NotesService(db)
-    success = service.delete_note(note_id)
+    service = AsyncNotesService(db)
+    success = await service.delete_note(note_id)
     
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Note with ID {note_id} not found"
+            detail=not_found_detail(note_id)
         )
 
 @router.get("/stats/count")
 async def get_notes_count(
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get total count of notes.
+
+    Supports If-None-Match with the returned ETag.
     """
-    service = NotesService(db)
-    count = service.get_notes_count()
+    service = AsyncNotesService(db)
+    revision = await service.get_revision()
+    etag = make_etag(revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    count = await service.get_notes_count(revision)
+    response.headers.update(etag_headers(etag))
     return {"total_notes": count}
+
+@router.get("/stats/cache")
+async def get_cache_stats():
+    """
+    Get hit/miss/eviction counters of the notes cache.
+    """
+    return notes_cache.stats()
@@ -1 +1,8 @@
-from .notes import StatusType, NoteCreate, NoteUpdate, NoteResponse
\ No newline at end of file
+from .notes import (
+    StatusType, ExportFormat, SortField, SortOrder, NoteCreate, NoteUpdate, NoteResponse, NotesPage, NotesStats, NoteSearchResult,
+    NotesListParams, NotesSearchParams,
+    NoteBatchUpdateItem, NotesBatchCreate, NotesBatchUpdate, NotesBatchDelete,
+    BatchItemStatus, BatchItemResult, BatchResult,
+    ImportRowError, ImportSummary, NotesLookup, NotesLookupResult,
+)
+from .rows import NOTE_COLUMNS, FIELDS_DESCRIPTION, parse_fields, NoteRow, NotesPageRow, NotesLookupRow, dump_notes, dump_notes_page, dump_notes_lookup
\ No newline at end of file
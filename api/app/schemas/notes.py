@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List, Optional
 from enum import Enum
+from .rows import FIELDS_DESCRIPTION
 
 
 class StatusType(str, Enum):
@@ -10,6 +11,44 @@ class StatusType(str, Enum):
     NOT_ACTIVATE = "not_activate"
 
 
+class ExportFormat(str, Enum):
+    """Enum for export formats."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class SortField(str, Enum):
+    """Enum for list ordering, every value is backed by an index."""
+    ID = "id"
+    NAME = "name"
+    STATUS = "status"
+
+
+class SortOrder(str, Enum):
+    """Enum for sort direction."""
+    ASC = "asc"
+    DESC = "desc"
+
+
+class NotesListParams(BaseModel):
+    """Query parameters of the notes list (also validated by the MCP embedded backend)."""
+    skip: int = Field(0, ge=0, description="Number of records to skip")
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of records")
+    status_filter: Optional[List[StatusType]] = Field(None, description="Filter by status, repeat for several")
+    name_prefix: Optional[str] = Field(None, min_length=1, max_length=255, description="Only notes whose name starts with this")
+    sort: SortField = Field(SortField.ID, description="Column to order by")
+    order: SortOrder = Field(SortOrder.ASC, description="Sort direction")
+    cursor: Optional[str] = Field(None, description="Cursor from next_cursor (empty for the first page)")
+    fields: Optional[str] = Field(None, description=FIELDS_DESCRIPTION)
+
+
+class NotesSearchParams(BaseModel):
+    """Query parameters of the full-text search."""
+    q: str = Field(..., min_length=1, max_length=500, description="Search query")
+    limit: int = Field(20, ge=1, le=100, description="Maximum number of records")
+    status_filter: Optional[StatusType] = Field(None, description="Filter by status")
+
+
 class NoteCreate(BaseModel):
     """Schema for creating note."""
     name: str = Field(..., max_length=255)
@@ -25,6 +64,14 @@ class NoteUpdate(BaseModel):
     comment: Optional[str] = None
     status: Optional[StatusType] = None
 
+    @field_validator("name", "status")
+    @classmethod
+    def not_null(cls, value):
+        """name and status may be omitted, but not set to null (the columns are NOT NULL)."""
+        if value is None:
+            raise ValueError("cannot be null")
+        return value
+
 
 class NoteResponse(BaseModel):
     """Schema for getting note."""
@@ -36,3 +83,84 @@ class NoteResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class NotesPage(BaseModel):
+    """Schema for a cursor-paginated page of notes."""
+    items: List[NoteResponse]
+    next_cursor: Optional[str] = None
+
+
+class NoteBatchUpdateItem(NoteUpdate):
+    """Schema for one item of a batch update."""
+    id: int
+
+
+class NotesBatchCreate(BaseModel):
+    """Schema for batch creating notes."""
+    items: List[NoteCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class NotesBatchUpdate(BaseModel):
+    """Schema for batch updating notes."""
+    items: List[NoteBatchUpdateItem] = Field(..., min_length=1, max_length=1000)
+
+
+class NotesBatchDelete(BaseModel):
+    """Schema for batch deleting notes."""
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchItemStatus(str, Enum):
+    """Enum for the outcome of one batch item."""
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+
+
+class BatchItemResult(BaseModel):
+    """Schema for the outcome of one batch item."""
+    id: Optional[int]
+    status: BatchItemStatus
+    note: Optional[NoteResponse] = None
+
+
+class BatchResult(BaseModel):
+    """Schema for a batch operation response, items in request order."""
+    results: List[BatchItemResult]
+
+
+class NotesStats(BaseModel):
+    """Schema for note counts, total and per status."""
+    total_notes: int
+    by_status: Dict[StatusType, int]
+
+
+class NoteSearchResult(NoteResponse):
+    """Schema for a full-text search hit."""
+    rank: float
+
+
+class ImportRowError(BaseModel):
+    """Schema for a rejected import row."""
+    line: int
+    error: str
+
+
+class ImportSummary(BaseModel):
+    """Schema for an import result. `errors` holds at most the first 100 rejected rows."""
+    accepted: int = 0
+    rejected: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+
+class NotesLookup(BaseModel):
+    """Schema for getting several notes by id."""
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class NotesLookupResult(BaseModel):
+    """Schema for a multi-get result: found notes in request order and missing ids."""
+    items: List[NoteResponse]
+    missing: List[int]
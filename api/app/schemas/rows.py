@@ -0,0 +1,68 @@
+from typing import List, Optional, Tuple, TypedDict
+from pydantic import TypeAdapter
+
+NOTE_COLUMNS = ("id", "name", "description", "comment", "status")
+FIELDS_DESCRIPTION = "Comma-separated columns to return: id, name, description, comment, status (id is always included)"
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a `fields=` projection ("name,status") into columns in canonical order.
+
+    id is always included. None or empty means every column.
+    """
+    if not fields:
+        return NOTE_COLUMNS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(NOTE_COLUMNS)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(NOTE_COLUMNS)}"
+        )
+    requested.add("id")
+    return tuple(column for column in NOTE_COLUMNS if column in requested)
+
+
+class NoteRow(TypedDict):
+    """Plain note row for the fast list path; same JSON shape as NoteResponse.
+
+    With a field projection only the selected keys are present (id always is).
+    """
+    id: int
+    name: str
+    description: Optional[str]
+    comment: Optional[str]
+    status: str
+
+
+class NotesPageRow(TypedDict):
+    """Plain cursor page; same JSON shape as NotesPage."""
+    items: List[NoteRow]
+    next_cursor: Optional[str]
+
+
+class NotesLookupRow(TypedDict):
+    """Plain multi-get result; same JSON shape as NotesLookupResult."""
+    items: List[NoteRow]
+    missing: List[int]
+
+
+# Built once at import: serializing through a prebuilt adapter skips per-request
+# model validation and the jsonable_encoder pass of response_model.
+note_rows_adapter = TypeAdapter(List[NoteRow])
+notes_page_adapter = TypeAdapter(NotesPageRow)
+notes_lookup_adapter = TypeAdapter(NotesLookupRow)
+
+
+def dump_notes(rows: List[NoteRow]) -> bytes:
+    """Serialize note rows to a JSON array."""
+    return note_rows_adapter.dump_json(rows)
+
+
+def dump_notes_page(rows: List[NoteRow], next_cursor: Optional[str]) -> bytes:
+    """Serialize a cursor page to JSON."""
+    return notes_page_adapter.dump_json({"items": rows, "next_cursor": next_cursor})
+
+
+def dump_notes_lookup(rows: List[NoteRow], missing: List[int]) -> bytes:
+    """Serialize a multi-get result to JSON."""
+    return notes_lookup_adapter.dump_json({"items": rows, "missing": missing})
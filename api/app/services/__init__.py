@@ -1 +1,8 @@
-from .notes_service import NotesService
\ No newline at end of file
+from .notes_service import NotesService
+from .async_notes_service import AsyncNotesService
+from .pagination import Cursor, encode_cursor, decode_cursor
+from .queries import NotesQuery
+from .export import ndjson_chunks, csv_chunks
+from .importer import ndjson_records, csv_records, validated_chunks
+from .etag import make_etag, etag_matches
+from .results import not_found_detail, notes_query, list_notes, stats_result, created_result, updated_result, deleted_result
\ No newline at end of file
@@ -0,0 +1,348 @@
+from sqlalchemy import Row, select, insert, update, delete, func, column, literal_column, bindparam, cast, case, Boolean, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from ..cache import NotesCache, notes_cache, note_key, COUNT_KEY
+from ..models import NotesMain, NotesStatusCount, NotesRevision, SEARCH_CONFIG
+from ..schemas import NoteCreate, NoteUpdate, NoteResponse, NoteSearchResult, NoteBatchUpdateItem, NoteRow, NOTE_COLUMNS
+from .pagination import Cursor
+from .queries import NotesQuery
+
+UPDATABLE_FIELDS = ("name", "description", "comment", "status")
+IMPORT_COLUMNS = ("name", "description", "comment", "status")
+# Lists select plain columns: no ORM identity map, no unmapped search_vector.
+NOTE_ROW_COLUMNS = {column_name: getattr(NotesMain, column_name) for column_name in NOTE_COLUMNS}
+
+def _typed_array(name: str, items: list, item_type):
+    """Bound array parameter with an explicit cast, so unnest() knows its element type."""
+    return cast(bindparam(name, items, type_=ARRAY(item_type)), ARRAY(item_type))
+
+class AsyncNotesService:
+    """Note functions on top of AsyncSession.
+
+    get_note and get_notes_count read through `cache`; writes invalidate the affected keys.
+    A value read from the database is only cached if no invalidation happened meanwhile.
+    """
+
+    def __init__(self, db: AsyncSession, cache: Optional[NotesCache] = notes_cache):
+        self.db = db
+        self.cache = cache
+
+    def _invalidate(self, *keys) -> None:
+        if self.cache is not None:
+            self.cache.delete(*keys)
+
+    async def create_note(self, note: NoteCreate) -> NotesMain:
+        """Create new note with one INSERT ... RETURNING."""
+        result = await self.db.scalars(
+            insert(NotesMain).values(**note.model_dump(mode="json")).returning(NotesMain)
+        )
+        db_note = result.one()
+        await self.db.commit()
+        self._invalidate(COUNT_KEY)
+        return db_note
+
+    def _cached(self, key, revision: Optional[int]):
+        """Cached value, None on miss or if it was loaded at another table revision than `revision`."""
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is None:
+            return None
+        loaded_at, value = entry
+        if revision is not None and loaded_at != revision:
+            return None
+        return value
+
+    def _fill(self, key, value, revision: Optional[int], generation: Optional[int]) -> None:
+        if self.cache is not None:
+            self.cache.set(key, (revision, value), generation)
+
+    async def get_note(self, note_id: int, revision: Optional[int] = None) -> Optional[NoteResponse]:
+        """Get note by id.
+
+        `revision` is the table revision read before this call (the one an ETag is
+        built from): a cached note loaded at any other revision is not used.
+        """
+        cached = self._cached(note_key(note_id), revision)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation() if self.cache is not None else None
+        db_note = await self.db.get(NotesMain, note_id)
+        if not db_note:
+            return None
+        note = NoteResponse.model_validate(db_note)
+        self._fill(note_key(note_id), note, revision, generation)
+        return note
+
+    @staticmethod
+    def _select_rows(fields: Sequence[str]):
+        return select(*(NOTE_ROW_COLUMNS[field] for field in fields))
+
+    async def _fetch_rows(self, stmt, fields: Sequence[str]) -> List[NoteRow]:
+        result = await self.db.execute(stmt)
+        return [dict(zip(fields, row)) for row in result.all()]
+
+    async def get_notes(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] = NOTE_COLUMNS,
+        query: NotesQuery = NotesQuery(),
+    ) -> List[NoteRow]:
+        """Get a paginated list of notes matching `query`, selecting only `fields` (must include id)."""
+        stmt = query.order_by(query.filter(self._select_rows(fields)))
+        return await self._fetch_rows(stmt.offset(skip).limit(limit), fields)
+
+    async def get_notes_after(
+        self,
+        after: Optional[Cursor],
+        limit: int = 100,
+        fields: Sequence[str] = NOTE_COLUMNS,
+        query: NotesQuery = NotesQuery(),
+    ) -> Tuple[List[NoteRow], Optional[Cursor]]:
+        """Get notes matching `query` that come after `after` (keyset pagination).
+
+        `after` is None for the first page. Returns the page and the cursor to
+        continue from, or None on the last page.
+        """
+        # The sort column is needed for the next cursor even when not requested.
+        selected = tuple(fields) if query.sort in fields else (*fields, query.sort)
+        stmt = query.filter(self._select_rows(selected))
+        if after is not None:
+            stmt = query.after(stmt, after)
+        notes = await self._fetch_rows(query.order_by(stmt).limit(limit + 1), selected)
+        next_cursor = query.cursor(notes[limit - 1]) if len(notes) > limit else None
+        notes = notes[:limit]
+        if len(selected) > len(fields):
+            for note in notes:
+                del note[query.sort]
+        return notes, next_cursor
+
+    async def get_notes_by_ids(
+        self, note_ids: Sequence[int], fields: Sequence[str] = NOTE_COLUMNS
+    ) -> Tuple[List[NoteRow], List[int]]:
+        """Get several notes with one WHERE id IN (...) query.
+
+        Returns found notes in the order of `note_ids` (duplicates collapsed) and missing ids.
+        """
+        unique_ids = list(dict.fromkeys(note_ids))
+        rows = await self._fetch_rows(
+            self._select_rows(fields).where(NotesMain.id.in_(unique_ids)), fields
+        )
+        by_id = {row["id"]: row for row in rows}
+        return (
+            [by_id[note_id] for note_id in unique_ids if note_id in by_id],
+            [note_id for note_id in unique_ids if note_id not in by_id],
+        )
+
+    async def update_note(self, note_id: int, note_update: NoteUpdate) -> Optional[NotesMain]:
+        """Update note with one UPDATE ... RETURNING. None if it does not exist."""
+        update_data = note_update.model_dump(mode="json", exclude_unset=True)
+        if not update_data:
+            result = await self.db.scalars(select(NotesMain).where(NotesMain.id == note_id))
+            return result.one_or_none()
+
+        result = await self.db.scalars(
+            update(NotesMain)
+            .where(NotesMain.id == note_id)
+            .values(**update_data)
+            .returning(NotesMain)
+            .execution_options(synchronize_session=False)
+        )
+        db_note = result.one_or_none()
+        await self.db.commit()
+        if db_note:
+            self._invalidate(note_key(note_id))
+        return db_note
+
+    async def delete_note(self, note_id: int) -> bool:
+        """Delete note with one DELETE ... RETURNING."""
+        result = await self.db.execute(
+            delete(NotesMain)
+            .where(NotesMain.id == note_id)
+            .returning(NotesMain.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        if deleted:
+            self._invalidate(note_key(note_id), COUNT_KEY)
+        return deleted
+
+    async def get_notes_by_status(
+        self, status: str, skip: int = 0, limit: int = 100, fields: Sequence[str] = NOTE_COLUMNS
+    ) -> List[NoteRow]:
+        """Get note by status."""
+        return await self.get_notes(skip, limit, fields, NotesQuery(statuses=(status,)))
+
+    async def get_notes_count(self, revision: Optional[int] = None) -> int:
+        """Get the number of notes. `revision` works as for get_note."""
+        cached = self._cached(COUNT_KEY, revision)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation() if self.cache is not None else None
+        result = await self.db.execute(select(func.coalesce(func.sum(NotesStatusCount.count), 0)))
+        count = int(result.scalar_one())
+        self._fill(COUNT_KEY, count, revision, generation)
+        return count
+
+    async def stream_notes(
+        self, status: Optional[str] = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Stream (id, name, description, comment, status) rows ordered by id.
+
+        Uses a server-side cursor, so only `batch_size` rows are held in memory.
+        """
+        stmt = select(
+            NotesMain.id, NotesMain.name, NotesMain.description, NotesMain.comment, NotesMain.status
+        )
+        if status:
+            stmt = stmt.where(NotesMain.status == status)
+        result = await self.db.stream(
+            stmt.order_by(NotesMain.id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def search_notes(
+        self, query: str, limit: int = 20, status: Optional[str] = None
+    ) -> List[NoteSearchResult]:
+        """Full-text search over name, description and comment, best matches first.
+
+        `query` uses websearch syntax: words, "quoted phrases", OR, -excluded.
+        """
+        search_vector = literal_column("notes_main.search_vector")
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), query)
+        rank = func.ts_rank_cd(search_vector, ts_query).label("rank")
+        stmt = select(NotesMain, rank).where(search_vector.op("@@")(ts_query))
+        if status:
+            stmt = stmt.where(NotesMain.status == status)
+        result = await self.db.execute(stmt.order_by(rank.desc(), NotesMain.id).limit(limit))
+        return [
+            NoteSearchResult(**NoteResponse.model_validate(note).model_dump(), rank=note_rank)
+            for note, note_rank in result.all()
+        ]
+
+    async def import_notes(self, chunks: AsyncIterator[List[NoteCreate]]) -> int:
+        """Load validated notes chunk by chunk in one transaction. Returns loaded rows.
+
+        PostgreSQL gets COPY through the asyncpg connection; other backends get
+        multi-row INSERTs. Chunks are consumed as they arrive, so the input is never
+        held in memory as a whole.
+        """
+        loaded = 0
+        if self.db.get_bind().dialect.name == "postgresql":
+            connection = await self.db.connection()
+            # The asyncpg adapter begins its transaction on the first statement sent
+            # through SQLAlchemy. COPY on the driver connection then runs inside the
+            # session's transaction and is committed or rolled back with it.
+            await connection.execute(select(1))
+            driver = (await connection.get_raw_connection()).driver_connection
+            async for chunk in chunks:
+                await driver.copy_records_to_table(
+                    NotesMain.__tablename__,
+                    columns=IMPORT_COLUMNS,
+                    records=[(note.name, note.description, note.comment, note.status.value) for note in chunk]
+                )
+                loaded += len(chunk)
+        else:
+            async for chunk in chunks:
+                await self.db.execute(insert(NotesMain), [note.model_dump(mode="json") for note in chunk])
+                loaded += len(chunk)
+        await self.db.commit()
+        if loaded:
+            self._invalidate(COUNT_KEY)
+        return loaded
+
+    async def get_revision(self) -> int:
+        """Get the table-level change counter of notes (for ETags)."""
+        result = await self.db.execute(select(NotesRevision.revision).where(NotesRevision.id == 1))
+        return result.scalar_one_or_none() or 0
+
+    async def get_notes_stats(self) -> Dict[str, int]:
+        """Get the number of notes per status from the trigger-maintained counters."""
+        result = await self.db.execute(select(NotesStatusCount.status, NotesStatusCount.count))
+        return {status: int(count) for status, count in result.all()}
+
+    async def create_notes(self, notes: List[NoteCreate]) -> List[NotesMain]:
+        """Create notes with one multi-row INSERT ... RETURNING, in input order."""
+        result = await self.db.scalars(
+            insert(NotesMain).returning(NotesMain, sort_by_parameter_order=True),
+            [note.model_dump(mode="json") for note in notes]
+        )
+        created = list(result.all())
+        await self.db.commit()
+        self._invalidate(COUNT_KEY)
+        return created
+
+    async def update_notes(self, items: List[NoteBatchUpdateItem]) -> Dict[int, NotesMain]:
+        """Update notes in one transaction. Returns updated notes by id.
+
+        Only fields set on an item are changed. Items with the same id are merged,
+        later ones win. PostgreSQL gets one UPDATE ... FROM unnest(...) RETURNING;
+        other backends get one UPDATE ... RETURNING per note.
+        """
+        changes_by_id: Dict[int, dict] = {}
+        for item in items:
+            changes_by_id.setdefault(item.id, {}).update(
+                item.model_dump(mode="json", exclude_unset=True, exclude={"id"})
+            )
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            updated = await self._update_from_arrays(changes_by_id)
+        else:
+            updated = {}
+            for note_id, data in changes_by_id.items():
+                stmt = (
+                    update(NotesMain).where(NotesMain.id == note_id).values(**data).returning(NotesMain)
+                    if data else select(NotesMain).where(NotesMain.id == note_id)
+                )
+                result = await self.db.scalars(
+                    stmt.execution_options(synchronize_session=False, populate_existing=True)
+                )
+                note = result.one_or_none()
+                if note is not None:
+                    updated[note.id] = note
+        await self.db.commit()
+        self._invalidate(*(note_key(note_id) for note_id in updated))
+        return updated
+
+    async def _update_from_arrays(self, changes_by_id: Dict[int, dict]) -> Dict[int, NotesMain]:
+        """One UPDATE ... FROM unnest(...) RETURNING for all changes (PostgreSQL).
+
+        Changes are sent as one typed array per column, so the statement text is
+        the same for any batch and every value is a bound parameter.
+        """
+        table = NotesMain.__table__
+        arrays = [_typed_array("ids", list(changes_by_id), Integer())]
+        columns = [column("id", Integer)]
+        for field in UPDATABLE_FIELDS:
+            field_type = table.c[field].type
+            arrays += [
+                _typed_array(field, [data.get(field) for data in changes_by_id.values()], field_type),
+                _typed_array(f"set_{field}", [field in data for data in changes_by_id.values()], Boolean()),
+            ]
+            columns += [column(field, field_type), column(f"set_{field}", Boolean)]
+        changes = func.unnest(*arrays).table_valued(*columns).render_derived(name="changes")
+
+        result = await self.db.scalars(
+            update(NotesMain)
+            .where(NotesMain.id == changes.c.id)
+            .values({
+                field: case((changes.c[f"set_{field}"], changes.c[field]), else_=table.c[field])
+                for field in UPDATABLE_FIELDS
+            })
+            .returning(NotesMain)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return {note.id: note for note in result.all()}
+
+    async def delete_notes(self, note_ids: List[int]) -> Set[int]:
+        """Delete notes with one DELETE ... RETURNING. Returns deleted ids."""
+        result = await self.db.execute(
+            delete(NotesMain)
+            .where(NotesMain.id.in_(note_ids))
+            .returning(NotesMain.id)
+        )
+        deleted = set(result.scalars().all())
+        await self.db.commit()
+        self._invalidate(*(note_key(note_id) for note_id in deleted), COUNT_KEY)
+        return deleted
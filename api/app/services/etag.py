@@ -0,0 +1,19 @@
+from typing import Optional
+
+
+def make_etag(revision: int) -> str:
+    """Weak ETag for any notes representation at the given table revision."""
+    return f'W/"notes-{revision}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == bare
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,30 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+EXPORT_COLUMNS = ("id", "name", "description", "comment", "status")
+
+
+async def ndjson_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """One JSON object per line, one chunk per partition of rows."""
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+async def csv_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """CSV with a header row, one chunk per partition of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
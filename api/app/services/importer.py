@@ -0,0 +1,100 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from ..schemas import NoteCreate, ImportSummary, ImportRowError
+
+MAX_REPORTED_ERRORS = 100
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines (LF or CRLF) without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_number = 0
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.removesuffix("\r")
+
+
+async def ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line, parsed object) for every non-empty NDJSON line, or (line, error message)."""
+    async for line_number, line in _lines(stream):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e.msg}"
+
+
+async def csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line, dict) for every CSV record after the header, or (line, error message).
+
+    Quoted fields may span lines: a record is complete once its quotes are balanced.
+    """
+    header = None
+    record, record_line = [], 0
+    async for line_number, line in _lines(stream):
+        if not record:
+            record_line = line_number
+        record.append(line)
+        text = "\n".join(record)
+        if text.count('"') % 2:
+            continue
+        record = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        if len(values) != len(header):
+            yield record_line, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # CSV has no NULL: empty optional fields become None, empty status gets the default.
+        yield record_line, {key: value for key, value in zip(header, values) if value != ""}
+    if record:
+        yield record_line, "Unterminated quoted field"
+
+
+async def validated_chunks(
+    records: AsyncIterator[Tuple[int, object]],
+    summary: ImportSummary,
+    chunk_size: int = 5000,
+) -> AsyncIterator[List[NoteCreate]]:
+    """Validate records against NoteCreate, yield accepted ones in chunks, count the rest in `summary`."""
+    chunk: List[NoteCreate] = []
+    async for line_number, record in records:
+        error = None
+        if isinstance(record, str):
+            error = record
+        elif not isinstance(record, dict):
+            error = "Expected an object"
+        else:
+            try:
+                chunk.append(NoteCreate.model_validate(record))
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+        if error is not None:
+            summary.rejected += 1
+            if len(summary.errors) < MAX_REPORTED_ERRORS:
+                summary.errors.append(ImportRowError(line=line_number, error=error))
+        elif len(chunk) >= chunk_size:
+            summary.accepted += len(chunk)
+            yield chunk
+            chunk = []
+    if chunk:
+        summary.accepted += len(chunk)
+        yield chunk
@@ -1,3 +1,4 @@
+from sqlalchemy import insert, update, delete
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -11,17 +12,11 @@ class NotesService:
         self.db = db
     
     def create_note(self, note: NoteCreate) -> NotesMain:
-        """Create new note."""
-        db_note = NotesMain(
-            name=note.name,
-            description=note.description,
-            comment=note.comment,
-            status=note.status
-        )
-        
-        self.db.add(db_note)
+        """Create new note with one INSERT ... RETURNING."""
+        db_note = self.db.scalars(
+            insert(NotesMain).values(**note.model_dump(mode="json")).returning(NotesMain)
+        ).one()
         self.db.commit()
-        self.db.refresh(db_note)
         return db_note
     
     def get_note(self, note_id: int) -> Optional[NotesMain]:
@@ -33,28 +28,30 @@ class NotesService:
         return self.db.query(NotesMain).offset(skip).limit(limit).all()
 
     def update_note(self, note_id: int, note_update: NoteUpdate) -> Optional[NotesMain]:
-        """Update note."""
-        db_note = self.get_note(note_id)
-        if not db_note:
-            return None
-        
-        update_data = note_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_note, field, value)
-        
+        """Update note with one UPDATE ... RETURNING."""
+        update_data = note_update.model_dump(mode="json", exclude_unset=True)
+        if not update_data:
+            return self.get_note(note_id)
+
+        db_note = self.db.scalars(
+            update(NotesMain)
+            .where(NotesMain.id == note_id)
+            .values(**update_data)
+            .returning(NotesMain)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
         self.db.commit()
-        self.db.refresh(db_note)
         return db_note
     
     def delete_note(self, note_id: int) -> bool:
-        """Delete note."""
-        db_note = self.get_note(note_id)
-        if not db_note:
-            return False
-        
-        self.db.delete(db_note)
+        """Delete note with one DELETE ... RETURNING."""
+        deleted_id = self.db.execute(
+            delete(NotesMain)
+            .where(NotesMain.id == note_id)
+            .returning(NotesMain.id)
+        ).scalar_one_or_none()
         self.db.commit()
-        return True
+        return deleted_id is not None
     
     def get_notes_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[NotesMain]:
         """Get note by status."""
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from typing import Any, NamedTuple, Optional
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page, in the ordering the page was read with."""
+    last_id: int
+    sort: str = "id"
+    order: str = "asc"
+    # Sort column value of the last row; None when sorting by id.
+    value: Any = None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Pack a cursor into an opaque string. Default id order keeps the short {"id": N} form."""
+    payload = {"id": cursor.last_id}
+    if cursor.sort != "id" or cursor.order != "asc":
+        payload.update(sort=cursor.sort, order=cursor.order, value=cursor.value)
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = "id", order: str = "asc") -> Optional[Cursor]:
+    """Unpack a cursor produced by encode_cursor. Empty cursor (first page) gives None.
+
+    The cursor must have been issued for the same `sort` and `order`.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        decoded = Cursor(
+            payload["id"], payload.get("sort", "id"), payload.get("order", "asc"), payload.get("value")
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(decoded.last_id, int) or (decoded.sort != "id" and not isinstance(decoded.value, str)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if (decoded.sort, decoded.order) != (sort, order):
+        raise ValueError(
+            f"Cursor was issued for sort={decoded.sort}, order={decoded.order}; "
+            f"got sort={sort}, order={order}"
+        )
+    return decoded
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+from ..models import NotesMain
+from ..schemas import NoteRow
+from .pagination import Cursor
+
+SORT_COLUMNS = {"id": NotesMain.id, "name": NotesMain.name, "status": NotesMain.status}
+
+
+def like_prefix(prefix: str) -> str:
+    """LIKE pattern matching strings that start with `prefix` literally."""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+@dataclass(frozen=True)
+class NotesQuery:
+    """Filters and ordering of a note list, composed into a single SELECT.
+
+    Every ordering ends with id, so it is total and pages are stable. Each sort
+    column has an index that leads with it (pk, ix_notes_main_name_id,
+    ix_notes_main_status_id); name_prefix is served by ix_notes_main_name_pattern.
+    """
+    statuses: Tuple[str, ...] = ()
+    name_prefix: Optional[str] = None
+    sort: str = "id"
+    order: str = "asc"
+
+    def filter(self, stmt):
+        """Add the WHERE clauses."""
+        if self.statuses:
+            stmt = stmt.where(NotesMain.status.in_(self.statuses))
+        if self.name_prefix:
+            stmt = stmt.where(NotesMain.name.like(like_prefix(self.name_prefix), escape="\\"))
+        return stmt
+
+    def order_by(self, stmt):
+        """Add ORDER BY <sort>, id in the requested direction."""
+        keys = [NotesMain.id] if self.sort == "id" else [SORT_COLUMNS[self.sort], NotesMain.id]
+        if self.order == "desc":
+            keys = [key.desc() for key in keys]
+        return stmt.order_by(*keys)
+
+    def after(self, stmt, cursor: Cursor):
+        """Keep only rows past `cursor` (keyset condition matching order_by)."""
+        if self.sort == "id":
+            position, bound = NotesMain.id, cursor.last_id
+        else:
+            position = tuple_(SORT_COLUMNS[self.sort], NotesMain.id)
+            bound = tuple_(cursor.value, cursor.last_id)
+        return stmt.where(position < bound if self.order == "desc" else position > bound)
+
+    def cursor(self, row: NoteRow) -> Cursor:
+        """Cursor pointing after `row`, which must contain id and the sort column."""
+        value = None if self.sort == "id" else row[self.sort]
+        return Cursor(row["id"], self.sort, self.order, value)
@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, List, Sequence, Set
+
+from ..models import NotesMain
+from ..schemas import (
+    NotesListParams, NotesStats, StatusType, NoteBatchUpdateItem,
+    BatchItemStatus, BatchItemResult, BatchResult, dump_notes, dump_notes_page,
+)
+from .async_notes_service import AsyncNotesService
+from .pagination import encode_cursor, decode_cursor
+from .queries import NotesQuery
+
+# Shared by the notes router and the MCP embedded backend, so both answer the same way.
+
+
+def not_found_detail(note_id: int) -> str:
+    return f"Note with ID {note_id} not found"
+
+
+def notes_query(params: NotesListParams) -> NotesQuery:
+    """Filters and ordering of a notes list request."""
+    return NotesQuery(
+        statuses=tuple(dict.fromkeys(status_type.value for status_type in params.status_filter or ())),
+        name_prefix=params.name_prefix,
+        sort=params.sort.value,
+        order=params.order.value,
+    )
+
+
+async def list_notes(service: AsyncNotesService, params: NotesListParams, columns: Sequence[str]) -> bytes:
+    """Notes list as JSON: an array, or a page with next_cursor when `cursor` is set.
+
+    Raises ValueError for a cursor that is invalid or was issued for another ordering.
+    """
+    query = notes_query(params)
+    if params.cursor is None:
+        return dump_notes(await service.get_notes(params.skip, params.limit, columns, query))
+    after = decode_cursor(params.cursor, query.sort, query.order)
+    notes, next_position = await service.get_notes_after(after, params.limit, columns, query)
+    return dump_notes_page(notes, encode_cursor(next_position) if next_position is not None else None)
+
+
+def stats_result(by_status: Dict[str, int]) -> NotesStats:
+    return NotesStats(
+        total_notes=sum(by_status.values()),
+        by_status={status_type: by_status.get(status_type.value, 0) for status_type in StatusType}
+    )
+
+
+def created_result(notes: Iterable[NotesMain]) -> BatchResult:
+    return BatchResult(results=[
+        BatchItemResult(id=note.id, status=BatchItemStatus.CREATED, note=note)
+        for note in notes
+    ])
+
+
+def updated_result(items: List[NoteBatchUpdateItem], updated: Dict[int, NotesMain]) -> BatchResult:
+    return BatchResult(results=[
+        BatchItemResult(id=item.id, status=BatchItemStatus.UPDATED, note=updated[item.id])
+        if item.id in updated
+        else BatchItemResult(id=item.id, status=BatchItemStatus.NOT_FOUND)
+        for item in items
+    ])
+
+
+def deleted_result(note_ids: List[int], deleted: Set[int]) -> BatchResult:
+    return BatchResult(results=[
+        BatchItemResult(
+            id=note_id,
+            status=BatchItemStatus.DELETED if note_id in deleted else BatchItemStatus.NOT_FOUND
+        )
+        for note_id in note_ids
+    ])
@@ -0,0 +1 @@
+"""Benchmarks for the Notes API, the MCP server and the service layer."""
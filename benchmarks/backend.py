@@ -0,0 +1,139 @@
+"""Database setup for the benchmark suite: PostgreSQL or an in-process SQLite stand-in.
+
+`configure` must run before anything imports `app.config`, it decides which
+database the engines point at. The suite writes and deletes notes, so it only
+runs against a dedicated database named by BENCH_DATABASE_URL, never the one
+the API is configured with. PostgreSQL gets the real migrations. SQLite gets
+`create_all` plus triggers that keep the status counters and the revision row
+up to date; the full-text search column has no SQLite equivalent, so
+operations using it are skipped there.
+"""
+import os
+import tempfile
+import uuid
+from typing import Iterable, List
+
+SEED_PREFIX = "bench "
+# Every note this run creates is named with RUN_PREFIX, so its ids can be told apart from other runs.
+RUN_PREFIX = f"{SEED_PREFIX}{uuid.uuid4().hex[:8]} "
+STATUSES = ("done", "in_progress", "not_activate")
+
+# Operations that only work on PostgreSQL, keyed by benchmark name.
+POSTGRES_ONLY = {
+    "GET /search",
+    "service.search_notes",
+    "mcp.Поиск задач",
+}
+
+SQLITE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_main_counts_insert AFTER INSERT ON notes_main BEGIN
+        INSERT INTO notes_status_counts (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        UPDATE notes_revision SET revision = revision + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_main_counts_delete AFTER DELETE ON notes_main BEGIN
+        UPDATE notes_status_counts SET count = count - 1 WHERE status = OLD.status;
+        UPDATE notes_revision SET revision = revision + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_main_counts_update AFTER UPDATE ON notes_main BEGIN
+        UPDATE notes_status_counts SET count = count - 1 WHERE status = OLD.status;
+        INSERT INTO notes_status_counts (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        UPDATE notes_revision SET revision = revision + 1 WHERE id = 1;
+    END
+    """,
+)
+
+
+def configure(backend: str) -> str:
+    """Point the API config at the benchmark database and return its URL.
+
+    postgres needs BENCH_DATABASE_URL. sqlite uses BENCH_DATABASE_URL if set,
+    else a fresh file in a temp directory. DATABASE_URL and the DB_* values
+    from .env are never used; a BENCH_DATABASE_URL equal to DATABASE_URL is refused.
+    """
+    bench_url = os.getenv("BENCH_DATABASE_URL")
+    if not bench_url:
+        if backend != "sqlite":
+            raise SystemExit("Set BENCH_DATABASE_URL to a dedicated database, the suite writes and deletes notes")
+        path = os.path.join(tempfile.mkdtemp(prefix="notes-bench-"), "notes.db")
+        bench_url = f"sqlite+aiosqlite:///{path}"
+    elif bench_url == os.getenv("DATABASE_URL"):
+        raise SystemExit("BENCH_DATABASE_URL must not be the API's DATABASE_URL")
+    os.environ["DATABASE_URL"] = bench_url
+    # The embedded MCP backend calls the service in this process.
+    os.environ["MCP_BACKEND"] = "embedded"
+    from app.config import async_engine
+    return async_engine.url.render_as_string(hide_password=True)
+
+
+def prepare_schema() -> None:
+    """Create or migrate the schema of the configured database."""
+    from sqlalchemy import text
+    from app.config import engine
+    from app.migrations import apply_migrations
+    from app.models import Base
+
+    with engine.connect() as conn:
+        if engine.dialect.name != "sqlite":
+            apply_migrations(conn)
+            return
+        Base.metadata.create_all(conn)
+        for trigger in SQLITE_TRIGGERS:
+            conn.execute(text(trigger))
+        conn.execute(text("INSERT OR IGNORE INTO notes_revision (id, revision) VALUES (1, 1)"))
+        conn.commit()
+
+
+def seed_notes(amount: int) -> List[int]:
+    """Insert `amount` notes with names starting with RUN_PREFIX, return their ids."""
+    from sqlalchemy import insert
+    from app.config import SessionLocal
+    from app.models import NotesMain
+
+    rows = [
+        {
+            "name": f"{RUN_PREFIX}{i:06d}",
+            "description": "Описание задачи для нагрузочного теста " * 3,
+            "comment": "Комментарий " * 2,
+            "status": STATUSES[i % len(STATUSES)],
+        }
+        for i in range(amount)
+    ]
+    with SessionLocal() as db:
+        note_ids = list(db.scalars(
+            insert(NotesMain).returning(NotesMain.id, sort_by_parameter_order=True), rows
+        ))
+        db.commit()
+    return note_ids
+
+
+def run_note_ids() -> List[int]:
+    """Ids of the notes this run created (seeded or written by benchmarks, e.g. imports)."""
+    from sqlalchemy import select
+    from app.config import SessionLocal
+    from app.models import NotesMain
+
+    with SessionLocal() as db:
+        return list(db.scalars(select(NotesMain.id).where(NotesMain.name.startswith(RUN_PREFIX, autoescape=True))))
+
+
+def cleanup(note_ids: Iterable[int]) -> int:
+    """Delete exactly these notes, return how many still existed."""
+    from sqlalchemy import delete
+    from app.config import SessionLocal
+    from app.models import NotesMain
+
+    note_ids = list(note_ids)
+    removed = 0
+    with SessionLocal() as db:
+        for start in range(0, len(note_ids), 1000):
+            result = db.execute(delete(NotesMain).where(NotesMain.id.in_(note_ids[start:start + 1000])))
+            removed += result.rowcount
+        db.commit()
+    return removed
@@ -0,0 +1,73 @@
+"""Shared helpers for benchmarks."""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+API_DIR = ROOT_DIR / "api"
+MCP_DIR = ROOT_DIR / "mcp"
+
+for path in (API_DIR, MCP_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and throughput in ops/s."""
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_ops": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+async def run_concurrent(
+    operation: Callable[[int], Awaitable[object]],
+    total: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """Run `operation(i)` `total` times with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def timed(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await operation(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(total)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_sync(operation: Callable[[int], object], total: int) -> Dict[str, float]:
+    """Run `operation(i)` `total` times sequentially."""
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for i in range(total):
+        op_started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - op_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def print_results(results: Dict[str, object]) -> None:
+    """Dump results as indented JSON."""
+    print(json.dumps(results, indent=2, ensure_ascii=False))
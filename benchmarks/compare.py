@@ -0,0 +1,62 @@
+"""Compare two benchmark suite result files operation by operation.
+
+Prints p50/p95/p99 of the baseline and the candidate with the relative change,
+and exits with status 1 if any p95 got slower than `--threshold` percent.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 20
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def operations(report: dict) -> Iterator[Tuple[str, Dict[str, float]]]:
+    for layer, results in report.items():
+        if layer == "meta":
+            continue
+        for name, summary in results.items():
+            if "p50_ms" in summary:
+                yield f"{layer}/{name}", summary
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main(baseline_path: str, candidate_path: str, threshold: float) -> int:
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = dict(operations(json.load(baseline_file)))
+    with open(candidate_path, encoding="utf-8") as candidate_file:
+        candidate = dict(operations(json.load(candidate_file)))
+
+    regressions = []
+    print(f"{'operation':<60} " + " ".join(f"{metric:>24}" for metric in METRICS))
+    for name in sorted(baseline.keys() & candidate.keys()):
+        cells = []
+        for metric in METRICS:
+            before, after = baseline[name][metric], candidate[name][metric]
+            cells.append(f"{before:8.2f} -> {after:8.2f} {change(before, after):+5.0f}%")
+        print(f"{name:<60} " + " ".join(f"{cell:>24}" for cell in cells))
+        if change(baseline[name]["p95_ms"], candidate[name]["p95_ms"]) > threshold:
+            regressions.append(name)
+    for name in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{name:<60} only in {'baseline' if name in baseline else 'candidate'}")
+
+    if regressions:
+        print(f"\np95 regressions over {threshold:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed p95 slowdown, percent")
+    args = parser.parse_args()
+    sys.exit(main(args.baseline, args.candidate, args.threshold))
@@ -0,0 +1,75 @@
+"""CPU cost of serializing one list page: response_model path vs prebuilt TypeAdapter.
+
+"response_model" reproduces what FastAPI did for `List[NoteResponse]` over ORM
+objects: validate every object with from_attributes, dump to JSON-compatible
+Python, then json.dumps. "fast" is the current path: plain column rows dumped
+to bytes by a TypeAdapter built once at import. No database is needed; rows
+are built in memory and plain attribute objects stand in for ORM instances.
+
+Usage (from the repository root):
+
+    python -m benchmarks.serialization --rows 1000 --repeat 200
+"""
+import argparse
+import json
+import time
+from types import SimpleNamespace
+from typing import List
+
+from .common import print_results, summarize
+
+from pydantic import TypeAdapter
+
+from app.schemas import NoteResponse, NOTE_COLUMNS, dump_notes
+
+
+def build_rows(count: int) -> List[tuple]:
+    return [
+        (i, f"Note {i}", "Описание задачи " * 10, "Комментарий " * 5, "in_progress")
+        for i in range(1, count + 1)
+    ]
+
+
+def response_model_path(adapter: TypeAdapter, notes: List[SimpleNamespace]) -> bytes:
+    validated = adapter.validate_python(notes, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows: List[tuple]) -> bytes:
+    return dump_notes([dict(zip(NOTE_COLUMNS, row)) for row in rows])
+
+
+def measure(operation, repeat: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        op_started = time.process_time()
+        operation()
+        latencies.append(time.process_time() - op_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main(rows_count: int, repeat: int) -> None:
+    rows = build_rows(rows_count)
+    notes = [SimpleNamespace(**dict(zip(NOTE_COLUMNS, row))) for row in rows]
+    adapter = TypeAdapter(List[NoteResponse])
+    assert json.loads(response_model_path(adapter, notes)) == json.loads(fast_path(rows))
+
+    slow = measure(lambda: response_model_path(adapter, notes), repeat)
+    fast = measure(lambda: fast_path(rows), repeat)
+    print_results({
+        "rows": rows_count,
+        "repeat": repeat,
+        "response_model": slow,
+        "fast": fast,
+        "cpu_speedup_p50": slow["p50_ms"] / fast["p50_ms"] if fast["p50_ms"] else None,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,109 @@
+"""Per-operation latency of note writes: ORM load/flush/refresh vs single RETURNING statement.
+
+"orm" reproduces the previous AsyncNotesService writes: SELECT before UPDATE and
+DELETE, refresh (another SELECT) after INSERT and UPDATE, each inside BEGIN/COMMIT.
+"returning" is the current AsyncNotesService: one INSERT/UPDATE/DELETE ... RETURNING
+per write, in the same BEGIN/COMMIT. The cache is disabled for both.
+
+Usage (from the repository root, with the API .env configured):
+
+    python -m benchmarks.write_latency --iterations 500
+"""
+import argparse
+import asyncio
+import time
+
+from .common import print_results, summarize
+
+from sqlalchemy import event
+
+from app.config import AsyncSessionLocal, async_engine
+from app.models import NotesMain
+from app.schemas import NoteCreate, NoteUpdate
+from app.services import AsyncNotesService
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+async def orm_create(db, note: NoteCreate) -> NotesMain:
+    db_note = NotesMain(**note.model_dump(mode="json"))
+    db.add(db_note)
+    await db.commit()
+    await db.refresh(db_note)
+    return db_note
+
+
+async def orm_update(db, note_id: int, note_update: NoteUpdate) -> NotesMain:
+    db_note = await db.get(NotesMain, note_id)
+    for field, value in note_update.model_dump(mode="json", exclude_unset=True).items():
+        setattr(db_note, field, value)
+    await db.commit()
+    await db.refresh(db_note)
+    return db_note
+
+
+async def orm_delete(db, note_id: int) -> bool:
+    db_note = await db.get(NotesMain, note_id)
+    await db.delete(db_note)
+    await db.commit()
+    return True
+
+
+async def returning_create(db, note: NoteCreate) -> NotesMain:
+    return await AsyncNotesService(db, cache=None).create_note(note)
+
+
+async def returning_update(db, note_id: int, note_update: NoteUpdate) -> NotesMain:
+    return await AsyncNotesService(db, cache=None).update_note(note_id, note_update)
+
+
+async def returning_delete(db, note_id: int) -> bool:
+    return await AsyncNotesService(db, cache=None).delete_note(note_id)
+
+
+async def measure(create, update_, delete_, iterations: int) -> dict:
+    """Create, update and delete `iterations` notes, one fresh session per operation."""
+    global statements
+    results = {}
+    ids = []
+    for name, run in (
+        ("create", lambda db, i: create(db, NoteCreate(name=f"benchmark note {i}"))),
+        ("update", lambda db, i: update_(db, ids[i], NoteUpdate(comment=f"updated {i}", status="done"))),
+        ("delete", lambda db, i: delete_(db, ids[i])),
+    ):
+        latencies = []
+        statements = 0
+        started = time.perf_counter()
+        for i in range(iterations):
+            async with AsyncSessionLocal() as db:
+                op_started = time.perf_counter()
+                note = await run(db, i)
+                latencies.append(time.perf_counter() - op_started)
+            if name == "create":
+                ids.append(note.id)
+        results[name] = summarize(latencies, time.perf_counter() - started)
+        results[name]["statements_per_op"] = statements / iterations
+    return results
+
+
+async def main(iterations: int) -> None:
+    results = {
+        "iterations": iterations,
+        "orm": await measure(orm_create, orm_update, orm_delete, iterations),
+        "returning": await measure(returning_create, returning_update, returning_delete, iterations),
+    }
+    await async_engine.dispose()
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
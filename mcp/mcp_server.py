@@ -1,17 +1,50 @@
+import asyncio
+import heapq
+import json
 import logging
 import os
-import requests
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 from dotenv import load_dotenv
-from typing import Annotated
+from typing import Annotated, List
 from pydantic import Field
-from schemas import StatusType 
+from schemas import StatusType, NoteField, COMPACT_FIELDS, SortField, SortOrder, NoteCreateItem, NoteUpdateItem
+from notes_client import NotesApiClient
+from metrics import InstrumentedNotesClient, ToolMetricsMiddleware, metrics_endpoint
 
 load_dotenv()
 
-mcp = FastMCP(name="MCP Server to work with tasks")
 NOTES_SERVICE_NAME=os.getenv("API_SERVICE_NAME")
 URL=f"http://{NOTES_SERVICE_NAME}:5252/api/v1/notes"
+# Настраивается в setup_logging; без нее (например, при импорте сервера) пишет в обычный logging
+logger = logging.getLogger("server")
+# Подсказки для клиента: результаты инструментов чтения можно переиспользовать,
+# пока не вызван инструмент записи
+READ_ONLY = ToolAnnotations(readOnlyHint=True, idempotentHint=True)
+CREATES = ToolAnnotations(readOnlyHint=False, destructiveHint=False)
+MODIFIES = ToolAnnotations(readOnlyHint=False, destructiveHint=True)
+# http - ходить в Notes API по REST, embedded - вызывать NotesService в этом же процессе
+MCP_BACKEND = os.getenv("MCP_BACKEND", "http")
+
+if MCP_BACKEND == "embedded":
+    from notes_embedded import EmbeddedNotesClient
+    notes_api = InstrumentedNotesClient(EmbeddedNotesClient())
+else:
+    notes_api = InstrumentedNotesClient(NotesApiClient.from_env(URL))
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Открывает общий клиент к Notes API на время работы сервера"""
+    async with notes_api:
+        yield
+
+
+mcp = FastMCP(name="MCP Server to work with tasks", lifespan=lifespan)
+mcp.add_middleware(ToolMetricsMiddleware())
+# Метрики Prometheus: время работы инструментов и ответы Notes API
+mcp.custom_route("/metrics", methods=["GET"], include_in_schema=False)(metrics_endpoint)
 
 def setup_logging() -> None:
     """Задает конфиг для логирования"""
@@ -43,7 +76,7 @@ def setup_logging() -> None:
     return logger
 
 
-@mcp.tool(name="Получение количества задач")
+@mcp.tool(name="Получение количества задач", annotations=READ_ONLY)
 async def get_notes_count() -> str:
     """Получает общее количество задач, доступных на сервере
 
@@ -51,7 +84,7 @@ async def get_notes_count() -> str:
     - Может быть использовано для осведомленности пользователя о его общем количестве задач
     - Для понимания того, какие параметры паггинации нужны для вызова функции get_notes
     """
-    response = requests.get(f"{URL}/stats/count")
+    response = await notes_api.get_notes_count()
     if response.status_code == 200:
         logger.info(f"Получение количества задач. Ответ: {response.text}")
         return response.text
@@ -59,35 +92,75 @@ async def get_notes_count() -> str:
         logger.error(f"Ошибка при получеии количества задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
         return f"Ошибка при получеии количества задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
 
-@mcp.tool(name="Получение задач с учетом паггинации")
+@mcp.tool(name="Получение статистики задач по статусам", annotations=READ_ONLY)
+async def get_notes_stats() -> str:
+    """Получает общее количество задач и количество задач в каждом статусе за один вызов
+
+    ## Примеры практического использования
+    - Пользователь спрашивает, сколько задач выполнено, в работе или не активировано
+    - Не нужно получать все задачи, чтобы посчитать их по статусам
+
+    ## Тело ответа
+    - **total_notes**: общее количество задач
+    - **by_status**: количество задач по статусам done, in_progress, not_activate
+    """
+    response = await notes_api.get_notes_stats()
+    if response.status_code == 200:
+        logger.info(f"Получение статистики задач. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при получении статистики задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при получении статистики задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+@mcp.tool(name="Получение задач с учетом паггинации", annotations=READ_ONLY)
 async def get_notes(
     skip: Annotated[int, Field(ge=0, default=0, description="Количество записей, котрые нужно пропустить")],
     limit: Annotated[int, Field(ge=1, le=1000, default=10, description="Количество записей, котрые нужно получить")],
-    status_filter: Annotated[StatusType, Field(default=None, description="Статус задачи, который может быть одним из трех типов: done, in_progress, not_activate. Если не передать значение, то выберутся все задачи")]
+    status_filter: Annotated[List[StatusType], Field(default=None, description="Статусы задач: done, in_progress, not_activate. Можно передать несколько. Если не передать значение, то выберутся все задачи")],
+    name_prefix: Annotated[str, Field(default=None, min_length=1, max_length=255, description="Начало названия задачи (с учетом регистра). Если не передать, фильтра по названию нет")],
+    sort: Annotated[SortField, Field(default=SortField.ID, description="Поле сортировки: id, name или status")],
+    order: Annotated[SortOrder, Field(default=SortOrder.ASC, description="Направление сортировки: asc или desc")],
+    cursor: Annotated[str, Field(default=None, description="Курсор из поля next_cursor предыдущего ответа. Пустая строка - первая страница. Если передан, skip игнорируется")],
+    fields: Annotated[List[NoteField], Field(default=COMPACT_FIELDS, description="Какие поля задач вернуть. По умолчанию только id, name и status. description и comment запрашивай, только если они нужны")]
 ) -> str:
-    """Получает задачи с учетом пагинации
+    """Получает задачи с учетом пагинации, фильтров и сортировки
 
     ## Правила работы
-    - Перед использованием нужно узнать общее количество задач и подобрать оптимальные параметры пагинации
-    - Нужно учесть получение всех задач. Возможно, за несколько вызовов функции, если за 1 невозможно
-    - Тип статуса может быть только один либо не быть вообще. Соответственно для 2х статусов нужно 2 раза вызвать функцию с разным фильтром. Но для получения всех статусов нужен лишь 1 вызов
-    
+    - Если нужны все задачи (или все задачи нескольких статусов), используй инструмент "Получение всех задач" - он соберет их за один вызов
+    - Узнавать общее количество задач заранее не нужно: листай страницы курсором, пока next_cursor не станет null
+    - В status_filter можно передать несколько статусов сразу - для нескольких статусов достаточно одного вызова
+    - Чтобы найти задачи по началу названия, используй name_prefix; для поиска по смыслу используй "Поиск задач"
+    - sort и order задают порядок (например, sort="name" - по алфавиту). При одинаковых значениях задачи упорядочены по id
+    - Курсор: первый вызов с cursor="", далее передавай next_cursor из ответа. sort, order и фильтры во всех вызовах обхода должны быть одинаковыми
+    - skip без курсора подходит только для одной страницы с начала списка: при изменении задач между вызовами страницы по skip могут пропускать или повторять задачи
+    - По умолчанию возвращаются только id, name и status. Если нужны описание или комментарий, добавь их в fields или получи конкретную задачу по ID
+
     ## Тело ответа
     - **id**: уникальный id задачи
     - **name**: название задачи
-    - **description**: описание задачи
-    - **comment**: комментарий к задаче
+    - **description**: описание задачи (только если запрошено в fields)
+    - **comment**: комментарий к задаче (только если запрошено в fields)
     - **status**: статус задачи
 
+    При использовании курсора ответ имеет вид {"items": [...], "next_cursor": "..."}
+
     Comment и description могут быть незаполнены т.к. не являются обязательными
     """
     params = {
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "sort": SortField(sort).value,
+        "order": SortOrder(order).value,
     }
     if status_filter:
-        params["status_filter"] = status_filter
-    response = requests.get(f"{URL}", params=params)
+        params["status_filter"] = [StatusType(status).value for status in status_filter]
+    if name_prefix:
+        params["name_prefix"] = name_prefix
+    if cursor is not None:
+        params["cursor"] = cursor
+    if fields:
+        params["fields"] = ",".join(NoteField(field).value for field in fields)
+    response = await notes_api.get_notes(params)
     if response.status_code == 200:
         logger.info(f"Получение задач с учетом паггинации. Ответ: {response.text}")
         return response.text
@@ -95,7 +168,122 @@ async def get_notes(
         logger.error(f"Ошибка при получеии задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
         return f"Ошибка при получеии задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
 
-@mcp.tool(name="Получение задачи по ID")
+@mcp.tool(name="Поиск задач", annotations=READ_ONLY)
+async def search_notes(
+    query: Annotated[str, Field(..., min_length=1, max_length=500, description="Поисковый запрос: слова из названия, описания или комментария задачи")],
+    limit: Annotated[int, Field(ge=1, le=100, default=10, description="Максимальное количество найденных задач")],
+    status_filter: Annotated[StatusType, Field(default=None, description="Статус задачи: done, in_progress, not_activate. Если не передать значение, поиск идет по всем задачам")]
+) -> str:
+    """Полнотекстовый поиск задач по названию, описанию и комментарию
+
+    ## Пример использования
+    - Пользователь просит найти задачу по теме, например "задача про счета"
+    - Используй поиск вместо получения всех задач, если нужна задача по смыслу, а не по id
+
+    ## Синтаксис запроса
+    - Несколько слов ищутся вместе, "фраза в кавычках" ищется целиком, OR - любое из слов, -слово исключает задачи с ним
+
+    ## Тело ответа
+    Список задач, самые релевантные первыми
+    - **id**: уникальный id задачи
+    - **name**: название задачи
+    - **description**: описание задачи
+    - **comment**: комментарий к задаче
+    - **status**: статус задачи
+    - **rank**: релевантность задачи запросу
+    """
+    params = {
+        "q": query,
+        "limit": limit
+    }
+    if status_filter:
+        params["status_filter"] = status_filter
+    response = await notes_api.search_notes(params)
+    if response.status_code == 200:
+        logger.info(f"Поиск задач. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при поиске задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при поиске задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+# Максимальный limit списка в Notes API: страниц обхода как можно меньше
+FETCH_ALL_PAGE_SIZE = 1000
+
+
+async def walk_status(status: str, fields: str, max_notes: int):
+    """Читает задачи одного статуса по курсору, не больше max_notes
+
+    Возвращает задачи, есть ли еще задачи, число запросов и ответ с ошибкой (None, если ошибок не было)
+    """
+    params = {"status_filter": [status], "fields": fields, "cursor": ""}
+    notes = []
+    requests = 0
+    while True:
+        params["limit"] = min(FETCH_ALL_PAGE_SIZE, max_notes - len(notes))
+        response = await notes_api.get_notes(params)
+        requests += 1
+        if response.status_code != 200:
+            return notes, False, requests, response
+        page = response.json()
+        notes.extend(page["items"])
+        if page["next_cursor"] is None or len(notes) >= max_notes:
+            return notes, page["next_cursor"] is not None, requests, None
+        params["cursor"] = page["next_cursor"]
+
+
+@mcp.tool(name="Получение всех задач", annotations=READ_ONLY)
+async def get_all_notes(
+    statuses: Annotated[List[StatusType], Field(default=None, description="Статусы задач, которые нужно получить: done, in_progress, not_activate. Можно передать несколько. Если не передать, выберутся задачи всех статусов")],
+    fields: Annotated[List[NoteField], Field(default=COMPACT_FIELDS, description="Какие поля задач вернуть. По умолчанию только id, name и status")],
+    max_notes: Annotated[int, Field(ge=1, le=5000, default=500, description="Максимальное количество задач в ответе")]
+) -> str:
+    """Получает все задачи (с учетом фильтра по статусам) за один вызов
+
+    ## Правила работы
+    - Используй, когда нужен полный список задач или задачи нескольких статусов сразу. Не нужно предварительно узнавать количество задач и вызывать get_notes несколько раз
+    - Если задач больше max_notes, вернутся первые max_notes, а truncated будет true
+
+    ## Как работает
+    - Задачи каждого статуса читаются отдельным обходом по курсору, обходы разных статусов идут параллельно
+    - Внутри обхода страницы идут по id одна за другой, поэтому задача не пропадет и не повторится, даже если между запросами задачи создают или удаляют
+
+    ## Тело ответа
+    - **items**: список задач, отсортированный по id
+    - **total**: сколько задач подходит под фильтр. Если truncated - false, это ровно число задач в items
+    - **truncated**: true, если вернулись не все подходящие задачи
+    """
+    field_values = ",".join(NoteField(field).value for field in fields or COMPACT_FIELDS)
+    status_values = list(dict.fromkeys(StatusType(status).value for status in statuses or StatusType))
+    walks = await asyncio.gather(*(walk_status(status, field_values, max_notes) for status in status_values))
+    for _, _, _, failed in walks:
+        if failed is not None:
+            logger.error(f"Ошибка при получении всех задач. Код ошибки: {failed.status_code}, текст ошибки: {failed.text}")
+            return f"Ошибка при получении всех задач. Код ошибки: {failed.status_code}, текст ошибки: {failed.text}"
+
+    # Обходы отсортированы по id; задача, сменившая статус во время обхода, может встретиться дважды
+    notes = {}
+    for note in heapq.merge(*(walk[0] for walk in walks), key=lambda note: note["id"]):
+        notes.setdefault(note["id"], note)
+    items = list(notes.values())[:max_notes]
+    truncated = len(notes) > max_notes or any(more for _, more, _, _ in walks)
+    requests = sum(walk[2] for walk in walks)
+
+    total = len(items)
+    if truncated:
+        # Сколько задач всего, известно только по статистике; она может немного отставать от обхода
+        response = await notes_api.get_notes_stats()
+        if response.status_code != 200:
+            logger.error(f"Ошибка при получении всех задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+            return f"Ошибка при получении всех задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+        stats = response.json()
+        counted = sum(stats["by_status"].get(status, 0) for status in status_values)
+        total = max(counted, total + 1)
+
+    result = json.dumps({"items": items, "total": total, "truncated": truncated}, ensure_ascii=False)
+    logger.info(f"Получение всех задач. Получено {len(items)} из {total} за {requests} запросов")
+    return result
+
+@mcp.tool(name="Получение задачи по ID", annotations=READ_ONLY)
 async def get_note(
     note_id: Annotated[int, Field(..., description="ID задачи, которую нужно получить. ID можно посмотреть в выводе get_notes")]
 ) -> str:
@@ -114,7 +302,7 @@ async def get_note(
 
     Comment и description могут быть незаполнены т.к. не являются обязательными
     """
-    response = requests.get(f"{URL}/{note_id}")
+    response = await notes_api.get_note(note_id)
     if response.status_code == 200:
         logger.info(f"Получение задачи по ID. Ответ: {response.text}")
         return response.text
@@ -122,7 +310,35 @@ async def get_note(
         logger.error(f"Ошибка при получеии задачи по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
         return f"Ошибка при получеии задачи по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
 
-@mcp.tool(name="Создание задачи")
+@mcp.tool(name="Получение нескольких задач по ID", annotations=READ_ONLY)
+async def lookup_notes(
+    note_ids: Annotated[List[int], Field(..., min_length=1, max_length=1000, description="Список ID задач, которые нужно получить. ID можно посмотреть в выводе get_notes")],
+    fields: Annotated[List[NoteField], Field(default=None, description="Какие поля задач вернуть. Если не передать, вернутся все поля")]
+) -> str:
+    """Получение нескольких конкретных задач за один вызов
+
+    ## Пример использования
+    - Нужно посмотреть детали нескольких задач, id которых ты помнишь
+    - Используй вместо нескольких вызовов получения задачи по ID
+
+    ## Тело ответа
+    - **items**: найденные задачи в порядке переданных id
+    - **missing**: id задач, которых не существует
+
+    Comment и description могут быть незаполнены т.к. не являются обязательными
+    """
+    params = {}
+    if fields:
+        params["fields"] = ",".join(NoteField(field).value for field in fields)
+    response = await notes_api.lookup_notes(note_ids, params)
+    if response.status_code == 200:
+        logger.info(f"Получение нескольких задач по ID. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при получении нескольких задач по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при получении нескольких задач по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+@mcp.tool(name="Создание задачи", annotations=CREATES)
 async def create_note(
     name: Annotated[str, Field(..., description="Название задачи")],
     description: Annotated[str, Field(default=None, description="Описание задаче")],
@@ -154,7 +370,7 @@ async def create_note(
     if status:
         data["status"] = status
 
-    response = requests.post(f"{URL}", json=data)
+    response = await notes_api.create_note(data)
     if response.status_code == 201:
         logger.info(f"Создание задачи. Ответ: {response.text}")
         return response.text
@@ -162,7 +378,7 @@ async def create_note(
         logger.error(f"Ошибка при создании задачи. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
         return f"Ошибка при создании задачи. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
     
-@mcp.tool(name="Удаление задачи")
+@mcp.tool(name="Удаление задачи", annotations=MODIFIES)
 async def delete_note(
     note_id: Annotated[int, Field(..., description="ID задачи, которую нужно удалить. ID можно посмотреть в выводе get_notes")]
 ) -> str:
@@ -174,7 +390,7 @@ async def delete_note(
     ## Важно
     - Перед удалением ОБЯЗАТЕЛЬНО нужно переспросить ту ли задачу нужно удалить
     """
-    response = requests.delete(f"{URL}/{note_id}")
+    response = await notes_api.delete_note(note_id)
     if response.status_code == 204:
         logger.info(f"Удаление задачи. Ответ: {response.text}")
         return response.text
@@ -182,7 +398,7 @@ async def delete_note(
         logger.error(f"Ошибка при удалении задачи по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
         return f"Ошибка при удалении задачи по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
 
-@mcp.tool(name="Обновление информации по задаче")
+@mcp.tool(name="Обновление информации по задаче", annotations=MODIFIES)
 async def update_note(
     note_id: Annotated[int, Field(..., description="ID задачи, которую нужно обновить. ID можно посмотреть в выводе get_notes")],
     name: Annotated[str, Field(default=None, description="Название задачи")],
@@ -215,7 +431,7 @@ async def update_note(
         data["status"] = status
     if len(data.keys()) == 0:
         return "Ошибка при использовании обновления задачи. Не передан ни один аргумент"
-    response = requests.put(f"{URL}/{note_id}", json=data)
+    response = await notes_api.update_note(note_id, data)
     if response.status_code == 200:
         logger.info(f"Обновление задачи. Ответ: {response.text}")
         return response.text
@@ -224,6 +440,79 @@ async def update_note(
         return f"Ошибка при обновлении задачи по ID. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
 
 
+@mcp.tool(name="Массовое создание задач", annotations=CREATES)
+async def create_notes_batch(
+    notes: Annotated[List[NoteCreateItem], Field(..., min_length=1, max_length=1000, description="Список задач для создания")]
+) -> str:
+    """Создание нескольких задач за один вызов
+
+    ## Важная информация при создании
+    - Используй вместо нескольких вызовов создания задачи, если пользователь просит создать больше одной задачи
+    - Создавать задачи нужно только по просьбе пользователя
+    - Все задачи создаются в одной транзакции: либо создаются все, либо ни одной
+
+    ## Тело ответа
+    - **results**: список результатов в порядке передачи задач, у каждого **id**, **status** (created) и **note** с созданной задачей
+    """
+    items = [note.model_dump(mode="json", exclude_none=True) for note in notes]
+    response = await notes_api.create_notes(items)
+    if response.status_code == 201:
+        logger.info(f"Массовое создание задач. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при массовом создании задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при массовом создании задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+@mcp.tool(name="Массовое обновление задач", annotations=MODIFIES)
+async def update_notes_batch(
+    notes: Annotated[List[NoteUpdateItem], Field(..., min_length=1, max_length=1000, description="Список изменений задач")]
+) -> str:
+    """Обновление нескольких задач за один вызов
+
+    ## Важные инструкции
+    - Используй вместо нескольких вызовов обновления задачи, если нужно изменить больше одной задачи
+    - У каждого элемента обязателен note_id, остальные поля передавай только если их указал пользователь
+    - Все изменения применяются в одной транзакции
+
+    ## Тело ответа
+    - **results**: список результатов в порядке передачи, у каждого **id**, **status** (updated или not_found) и **note** с обновленной задачей
+    """
+    items = []
+    for note in notes:
+        item = note.model_dump(mode="json", exclude_none=True)
+        item["id"] = item.pop("note_id")
+        if len(item.keys()) == 1:
+            return f"Ошибка при использовании массового обновления задач. Для задачи {note.note_id} не передан ни один аргумент"
+        items.append(item)
+    response = await notes_api.update_notes(items)
+    if response.status_code == 200:
+        logger.info(f"Массовое обновление задач. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при массовом обновлении задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при массовом обновлении задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+@mcp.tool(name="Массовое удаление задач", annotations=MODIFIES)
+async def delete_notes_batch(
+    note_ids: Annotated[List[int], Field(..., min_length=1, max_length=1000, description="Список ID задач, которые нужно удалить")]
+) -> str:
+    """Удаление нескольких задач по их id за один вызов
+
+    ## Важно
+    - Перед удалением ОБЯЗАТЕЛЬНО нужно переспросить те ли задачи нужно удалить
+
+    ## Тело ответа
+    - **results**: список результатов в порядке передачи, у каждого **id** и **status** (deleted или not_found)
+    """
+    response = await notes_api.delete_notes(note_ids)
+    if response.status_code == 200:
+        logger.info(f"Массовое удаление задач. Ответ: {response.text}")
+        return response.text
+    else:
+        logger.error(f"Ошибка при массовом удалении задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}")
+        return f"Ошибка при массовом удалении задач. Код ошибки: {response.status_code}, текст ошибки: {response.text}"
+
+
 if __name__ == "__main__":
     logger = setup_logging()
     logger.info("Start new server")
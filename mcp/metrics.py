@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import time
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+
+MCP_TOOL_DURATION = Histogram(
+    "mcp_tool_duration_seconds",
+    "Time to run one MCP tool call",
+    ["tool", "outcome"],
+)
+NOTES_API_CALL_DURATION = Histogram(
+    "mcp_notes_api_call_duration_seconds",
+    "Time of one Notes API call made by a tool, by the status code it returned",
+    ["operation", "status"],
+)
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Records the latency of every tool call, labeled by tool name.
+
+    outcome is "error" when the tool raised; tools that report upstream errors
+    as text still count as "ok", see mcp_notes_api_call_duration_seconds.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = "ok"
+            return result
+        finally:
+            MCP_TOOL_DURATION.labels(context.message.name, outcome).observe(time.perf_counter() - started)
+
+
+class InstrumentedNotesClient:
+    """Wraps NotesApiClient or EmbeddedNotesClient and times each call.
+
+    The status label is the response status code, or "error" when the call
+    raised (connection errors, timeouts).
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    async def __aenter__(self) -> "InstrumentedNotesClient":
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.__aexit__(*exc_info)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = await attribute(*args, **kwargs)
+                status = str(response.status_code)
+                return response
+            finally:
+                NOTES_API_CALL_DURATION.labels(name, status).observe(time.perf_counter() - started)
+
+        # Cache the wrapper, later lookups skip __getattr__.
+        setattr(self, name, timed)
+        return timed
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition of this process's metrics."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,155 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import httpx
+
+
+class NotesApiClient:
+    """Shared async HTTP client for the Notes API.
+
+    One pooled httpx.AsyncClient (keep-alive, timeouts) for all tool calls, with
+    a semaphore that bounds the number of requests in flight. Used as an async
+    context manager from the server lifespan; nested entries share the client,
+    it is closed when the last one exits.
+
+    GET responses that carry an ETag are kept in a small LRU keyed by URL and
+    revalidated with If-None-Match; on 304 the stored response is returned.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        concurrency: int = 50,
+        etag_cache_size: int = 256,
+    ):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.concurrency = concurrency
+        self.etag_cache_size = etag_cache_size
+        self._etag_cache: "OrderedDict[str, Tuple[str, httpx.Response]]" = OrderedDict()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._users = 0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls, base_url: str) -> "NotesApiClient":
+        """Build the client with limits from NOTES_API_* environment variables."""
+        return cls(
+            base_url,
+            timeout=float(os.getenv("NOTES_API_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("NOTES_API_CONNECT_TIMEOUT", "5")),
+            max_connections=int(os.getenv("NOTES_API_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("NOTES_API_MAX_KEEPALIVE", "20")),
+            concurrency=int(os.getenv("NOTES_API_CONCURRENCY", "50")),
+            etag_cache_size=int(os.getenv("NOTES_API_ETAG_CACHE_SIZE", "256")),
+        )
+
+    async def __aenter__(self) -> "NotesApiClient":
+        async with self._lock:
+            if self._users == 0:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    limits=self.limits,
+                )
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._users += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._client is not None:
+                await self._client.aclose()
+                self._client = None
+                self._etag_cache.clear()
+
+    async def request(self, method: str, path: str = "/", **kwargs) -> httpx.Response:
+        """Send a request relative to base_url, waiting for a free concurrency slot."""
+        if self._client is None:
+            raise RuntimeError("NotesApiClient is not started")
+        async with self._semaphore:
+            return await self._client.request(method, path, **kwargs)
+
+    async def get(self, path: str = "/", **kwargs) -> httpx.Response:
+        """Conditional GET: reuse the stored body when the API answers 304."""
+        if self._client is None or self.etag_cache_size <= 0:
+            return await self.request("GET", path, **kwargs)
+        key = str(self._client.build_request("GET", path, params=kwargs.get("params")).url)
+        cached = self._etag_cache.get(key)
+        if cached is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["If-None-Match"] = cached[0]
+            kwargs["headers"] = headers
+        response = await self.request("GET", path, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self._etag_cache.move_to_end(key)
+            return cached[1]
+        etag = response.headers.get("ETag")
+        if response.status_code == 200 and etag:
+            self._etag_cache[key] = (etag, response)
+            self._etag_cache.move_to_end(key)
+            while len(self._etag_cache) > self.etag_cache_size:
+                self._etag_cache.popitem(last=False)
+        else:
+            self._etag_cache.pop(key, None)
+        return response
+
+    async def post(self, path: str = "/", **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str = "/", **kwargs) -> httpx.Response:
+        return await self.request("PUT", path, **kwargs)
+
+    async def patch(self, path: str = "/", **kwargs) -> httpx.Response:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path: str = "/", **kwargs) -> httpx.Response:
+        return await self.request("DELETE", path, **kwargs)
+
+    async def get_notes_count(self) -> httpx.Response:
+        return await self.get("/stats/count")
+
+    async def get_notes_stats(self) -> httpx.Response:
+        return await self.get("/stats")
+
+    async def get_notes(self, params: dict) -> httpx.Response:
+        return await self.get("/", params=params)
+
+    async def search_notes(self, params: dict) -> httpx.Response:
+        return await self.get("/search", params=params)
+
+    async def get_note(self, note_id: int) -> httpx.Response:
+        return await self.get(f"/{note_id}")
+
+    async def lookup_notes(self, note_ids: list, params: dict) -> httpx.Response:
+        return await self.post("/lookup", params=params, json={"ids": note_ids})
+
+    async def create_note(self, data: dict) -> httpx.Response:
+        return await self.post("/", json=data)
+
+    async def update_note(self, note_id: int, data: dict) -> httpx.Response:
+        return await self.put(f"/{note_id}", json=data)
+
+    async def delete_note(self, note_id: int) -> httpx.Response:
+        return await self.delete(f"/{note_id}")
+
+    async def create_notes(self, items: list) -> httpx.Response:
+        return await self.post("/batch", json={"items": items})
+
+    async def update_notes(self, items: list) -> httpx.Response:
+        return await self.patch("/batch", json={"items": items})
+
+    async def delete_notes(self, note_ids: list) -> httpx.Response:
+        return await self.delete("/batch", json={"ids": note_ids})
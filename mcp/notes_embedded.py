@@ -0,0 +1,209 @@
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+API_DIR = os.getenv(
+    "NOTES_API_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"),
+)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+from app.config import AsyncSessionLocal, async_engine
+from app.schemas import (
+    NoteCreate, NoteUpdate, NoteResponse, NoteSearchResult, NotesListParams, NotesSearchParams,
+    NotesBatchCreate, NotesBatchUpdate, NotesBatchDelete, NotesLookup,
+    parse_fields, dump_notes_lookup,
+)
+from app.services import (
+    AsyncNotesService, not_found_detail, list_notes, stats_result, created_result, updated_result, deleted_result,
+)
+from app.metrics import instrument_engine, checkout_connection
+
+# Statement and pool timings go to this process's /metrics.
+instrument_engine(async_engine, "async")
+
+search_adapter = TypeAdapter(List[NoteSearchResult])
+
+
+@dataclass
+class EmbeddedResponse:
+    """Status code and body, shaped like the HTTP response the tools expect."""
+    status_code: int
+    text: str
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _json(status_code: int, content) -> EmbeddedResponse:
+    """Serialize like FastAPI's JSONResponse (compact, non-ASCII kept)."""
+    if isinstance(content, BaseModel):
+        return EmbeddedResponse(status_code, content.model_dump_json())
+    return EmbeddedResponse(status_code, json.dumps(content, ensure_ascii=False, separators=(",", ":")))
+
+
+def _not_found(note_id: int) -> EmbeddedResponse:
+    return _json(404, {"detail": not_found_detail(note_id)})
+
+
+def _invalid(e: ValidationError, location: str) -> EmbeddedResponse:
+    """422 with FastAPI's error list, locations prefixed with "query" or "body"."""
+    errors = [{**error, "loc": (location, *error["loc"])} for error in e.errors(include_url=False)]
+    return _json(422, {"detail": jsonable_encoder(errors)})
+
+
+class EmbeddedNotesClient:
+    """Notes client that calls AsyncNotesService in-process.
+
+    Same methods and responses as NotesApiClient, without the HTTP hop and
+    the extra JSON round trips. Requests are validated with the router's
+    models and results are shaped by the same helpers. Sessions come from
+    the API's pooled async engine.
+    """
+
+    def __init__(self):
+        self._users = 0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "EmbeddedNotesClient":
+        async with self._lock:
+            self._users += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                await async_engine.dispose()
+
+    @asynccontextmanager
+    async def _service(self) -> AsyncIterator[AsyncNotesService]:
+        async with AsyncSessionLocal() as db:
+            await checkout_connection(db, "async")
+            # No read-through cache: writes made through the API process would
+            # never invalidate it, so reads here always go to the database.
+            yield AsyncNotesService(db, cache=None)
+
+    async def get_notes_count(self) -> EmbeddedResponse:
+        async with self._service() as service:
+            count = await service.get_notes_count()
+        return _json(200, {"total_notes": count})
+
+    async def get_notes_stats(self) -> EmbeddedResponse:
+        async with self._service() as service:
+            by_status = await service.get_notes_stats()
+        return _json(200, stats_result(by_status))
+
+    async def get_notes(self, params: dict) -> EmbeddedResponse:
+        try:
+            list_params = NotesListParams.model_validate(params)
+        except ValidationError as e:
+            return _invalid(e, "query")
+        try:
+            columns = parse_fields(list_params.fields)
+        except ValueError as e:
+            return _json(422, {"detail": str(e)})
+        async with self._service() as service:
+            try:
+                content = await list_notes(service, list_params, columns)
+            except ValueError as e:
+                return _json(400, {"detail": str(e)})
+        return EmbeddedResponse(200, content.decode())
+
+    async def search_notes(self, params: dict) -> EmbeddedResponse:
+        try:
+            search_params = NotesSearchParams.model_validate(params)
+        except ValidationError as e:
+            return _invalid(e, "query")
+        status_value = search_params.status_filter.value if search_params.status_filter else None
+        async with self._service() as service:
+            hits = await service.search_notes(search_params.q, search_params.limit, status_value)
+        return EmbeddedResponse(200, search_adapter.dump_json(hits).decode())
+
+    async def get_note(self, note_id: int) -> EmbeddedResponse:
+        async with self._service() as service:
+            db_note = await service.get_note(note_id)
+        if not db_note:
+            return _not_found(note_id)
+        return _json(200, NoteResponse.model_validate(db_note))
+
+    async def lookup_notes(self, note_ids: list, params: dict) -> EmbeddedResponse:
+        try:
+            lookup = NotesLookup(ids=note_ids)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        try:
+            columns = parse_fields(params.get("fields"))
+        except ValueError as e:
+            return _json(422, {"detail": str(e)})
+        async with self._service() as service:
+            notes, missing = await service.get_notes_by_ids(lookup.ids, columns)
+        return EmbeddedResponse(200, dump_notes_lookup(notes, missing).decode())
+
+    async def create_note(self, data: dict) -> EmbeddedResponse:
+        try:
+            note = NoteCreate(**data)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        try:
+            async with self._service() as service:
+                db_note = await service.create_note(note)
+        except Exception as e:
+            return _json(500, {"detail": f"Error when creating a note: {str(e)}"})
+        return _json(201, NoteResponse.model_validate(db_note))
+
+    async def update_note(self, note_id: int, data: dict) -> EmbeddedResponse:
+        try:
+            note_update = NoteUpdate(**data)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        async with self._service() as service:
+            db_note = await service.update_note(note_id, note_update)
+        if not db_note:
+            return _not_found(note_id)
+        return _json(200, NoteResponse.model_validate(db_note))
+
+    async def delete_note(self, note_id: int) -> EmbeddedResponse:
+        async with self._service() as service:
+            success = await service.delete_note(note_id)
+        if not success:
+            return _not_found(note_id)
+        return EmbeddedResponse(204, "")
+
+    async def create_notes(self, items: list) -> EmbeddedResponse:
+        try:
+            batch = NotesBatchCreate(items=items)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        try:
+            async with self._service() as service:
+                notes = await service.create_notes(batch.items)
+        except Exception as e:
+            return _json(500, {"detail": f"Error when creating notes: {str(e)}"})
+        return _json(201, created_result(notes))
+
+    async def update_notes(self, items: list) -> EmbeddedResponse:
+        try:
+            batch = NotesBatchUpdate(items=items)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        async with self._service() as service:
+            updated = await service.update_notes(batch.items)
+        return _json(200, updated_result(batch.items, updated))
+
+    async def delete_notes(self, note_ids: list) -> EmbeddedResponse:
+        try:
+            batch = NotesBatchDelete(ids=note_ids)
+        except ValidationError as e:
+            return _invalid(e, "body")
+        async with self._service() as service:
+            deleted = await service.delete_notes(batch.ids)
+        return _json(200, deleted_result(batch.ids, deleted))
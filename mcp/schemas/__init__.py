@@ -1 +1 @@
-from .models import StatusType
\ No newline at end of file
+from .models import StatusType, NoteField, COMPACT_FIELDS, SortField, SortOrder, NoteCreateItem, NoteUpdateItem
\ No newline at end of file
@@ -1,7 +1,51 @@
 from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
 
 class StatusType(str, Enum):
     """Enum for status."""
     DONE = "done"
     IN_PROGRESS = "in_progress"
-    NOT_ACTIVATE = "not_activate"
\ No newline at end of file
+    NOT_ACTIVATE = "not_activate"
+
+
+class NoteField(str, Enum):
+    """Enum for note fields that can be requested."""
+    ID = "id"
+    NAME = "name"
+    DESCRIPTION = "description"
+    COMMENT = "comment"
+    STATUS = "status"
+
+
+COMPACT_FIELDS = [NoteField.ID, NoteField.NAME, NoteField.STATUS]
+
+
+class SortField(str, Enum):
+    """Enum for list ordering."""
+    ID = "id"
+    NAME = "name"
+    STATUS = "status"
+
+
+class SortOrder(str, Enum):
+    """Enum for sort direction."""
+    ASC = "asc"
+    DESC = "desc"
+
+
+class NoteCreateItem(BaseModel):
+    """Item for batch creating notes."""
+    name: str = Field(..., description="Название задачи")
+    description: Optional[str] = Field(default=None, description="Описание задачи")
+    comment: Optional[str] = Field(default=None, description="Комментарий к задаче")
+    status: StatusType = Field(default=StatusType.IN_PROGRESS, description="Статус задачи")
+
+
+class NoteUpdateItem(BaseModel):
+    """Item for batch updating notes."""
+    note_id: int = Field(..., description="ID задачи, которую нужно обновить")
+    name: Optional[str] = Field(default=None, description="Название задачи")
+    description: Optional[str] = Field(default=None, description="Описание задачи")
+    comment: Optional[str] = Field(default=None, description="Комментарий к задаче")
+    status: Optional[StatusType] = Field(default=None, description="Статус задачи")
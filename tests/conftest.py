@@ -0,0 +1,58 @@
+"""Shared fixtures: the API, the embedded MCP backend and the services run on a temporary SQLite database.
+
+The database is chosen before `app.config` is imported, so these settings must
+stay at the top. DATABASE_URL from the environment or .env is never used.
+
+Run from the repository root: `uv sync --group test && uv run pytest`.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="notes-tests-"), "notes.db")
+os.environ["MCP_BACKEND"] = "embedded"
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from benchmarks.backend import prepare_schema
+from app.cache import notes_cache
+from app.config import SessionLocal, async_engine
+from app.main import app
+from app.models import NotesMain
+
+prepare_schema()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_cleanup():
+    """Empty notes table and cache after the test; pooled connections belong to the test's event loop."""
+    yield
+    await async_engine.dispose()
+    with SessionLocal() as db:
+        db.execute(delete(NotesMain))
+        db.commit()
+    notes_cache.clear()
+
+
+@pytest.fixture
+async def client(db_cleanup):
+    """httpx client for /api/v1/notes, app runs in-process."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1/notes") as client:
+        yield client
+
+
+@pytest.fixture
+async def make_notes(client):
+    """Create notes through the batch route and return them."""
+    async def make_notes(*items: dict) -> list:
+        response = await client.post("/batch", json={"items": list(items)})
+        assert response.status_code == 201, response.text
+        return [result["note"] for result in response.json()["results"]]
+    return make_notes
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.cache import LRUCache, note_key
+from app.config import AsyncSessionLocal
+from app.schemas import NoteUpdate
+from app.services import AsyncNotesService
+
+pytestmark = pytest.mark.anyio
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.lru.time.monotonic", lambda: now[0])
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_drops_fill_started_before_an_invalidation():
+    cache = LRUCache()
+    generation = cache.generation()
+    cache.delete("a")
+    cache.set("a", "stale", generation)
+    assert cache.get("a") is None
+    cache.set("a", "fresh", cache.generation())
+    assert cache.get("a") == "fresh"
+    assert cache.stats()["stale_fills"] == 1
+
+
+async def test_service_reads_through_and_invalidates(client, make_notes):
+    [note] = await make_notes({"name": "a"})
+    cache = LRUCache()
+    async with AsyncSessionLocal() as db:
+        service = AsyncNotesService(db, cache=cache)
+        assert (await service.get_note(note["id"])).name == "a"
+        assert (await service.get_note(note["id"])).name == "a"
+        assert cache.stats()["hits"] == 1
+
+        await service.update_note(note["id"], NoteUpdate(name="b"))
+        assert cache.get(note_key(note["id"])) is None
+        assert (await service.get_note(note["id"])).name == "b"
+
+
+async def test_service_skips_fill_racing_with_a_write(client, make_notes):
+    [note] = await make_notes({"name": "a"})
+    cache = LRUCache()
+    async with AsyncSessionLocal() as reader_db, AsyncSessionLocal() as writer_db:
+        reader = AsyncNotesService(reader_db, cache=cache)
+        writer = AsyncNotesService(writer_db, cache=cache)
+        loaded = asyncio.Event()
+        get = reader_db.get
+
+        async def paused_get(*args, **kwargs):
+            result = await get(*args, **kwargs)
+            loaded.set()
+            # The write lands after the read, before the fill.
+            await asyncio.sleep(0.05)
+            return result
+
+        reader_db.get = paused_get
+        read = asyncio.create_task(reader.get_note(note["id"]))
+        await loaded.wait()
+        await writer.update_note(note["id"], NoteUpdate(name="b"))
+        assert (await read).name == "a"
+
+    assert cache.get(note_key(note["id"])) is None
+    assert cache.stats()["stale_fills"] == 1
+
+
+async def test_cached_note_is_not_served_for_another_revision(client, make_notes):
+    [note] = await make_notes({"name": "a"})
+    cache = LRUCache()
+    async with AsyncSessionLocal() as db:
+        service = AsyncNotesService(db, cache=cache)
+        revision = await service.get_revision()
+        await service.get_note(note["id"], revision)
+        assert cache.get(note_key(note["id"]))[0] == revision
+        # Under a newer revision the cached entry is reloaded, not served.
+        assert await service.get_note(note["id"], revision + 1) is not None
+        assert cache.get(note_key(note["id"]))[0] == revision + 1
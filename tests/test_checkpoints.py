@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from checkpoints import COMPRESSED_SUFFIX, CompressedSerializer, open_thread_activity
+
+pytestmark = pytest.mark.anyio
+
+# A dedicated, empty database, as in test_migrations.
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def test_large_values_are_compressed():
+    serde = CompressedSerializer(min_size=100)
+    small = {"text": "коротко"}
+    large = {"text": "длинное сообщение " * 100}
+
+    type_, data = serde.dumps_typed(small)
+    assert not type_.endswith(COMPRESSED_SUFFIX)
+    assert serde.loads_typed((type_, data)) == small
+
+    type_, data = serde.dumps_typed(large)
+    assert type_.endswith(COMPRESSED_SUFFIX)
+    assert len(data) < len(CompressedSerializer(min_size=10**9).dumps_typed(large)[1])
+    assert serde.loads_typed((type_, data)) == large
+
+
+def test_uncompressed_values_stay_readable():
+    plain = CompressedSerializer(min_size=10**9).dumps_typed({"text": "старое " * 100})
+    assert CompressedSerializer(min_size=1).loads_typed(plain) == {"text": "старое " * 100}
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "postgres"])
+async def test_thread_activity(backend, tmp_path):
+    if backend == "sqlite":
+        pytest.importorskip("aiosqlite")
+        url = str(tmp_path / "checkpoints.db")
+    elif backend == "postgres":
+        pytest.importorskip("psycopg_pool")
+        if not TEST_POSTGRES_URL:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+        url = TEST_POSTGRES_URL
+    else:
+        url = None
+    async with open_thread_activity(backend, url) as activity:
+        await activity.forget(["a", "b"])
+        await activity.touch("a", 100.0)
+        await activity.touch("b", 200.0)
+        await activity.touch("a", 300.0)
+        assert await activity.last_seen() == {"a": 300.0, "b": 200.0}
+        await activity.forget(["a", "missing"])
+        assert await activity.last_seen() == {"b": 200.0}
+        await activity.forget(["b"])
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+
+from checkpoints import ThreadActivity
+from conversations import ConversationRegistry, make_history_trimmer
+
+pytestmark = pytest.mark.anyio
+
+
+def later(monkeypatch, seconds: float) -> None:
+    now = time.time() + seconds
+    monkeypatch.setattr("conversations.time.time", lambda: now)
+
+
+async def saved_threads(checkpointer) -> set:
+    return {saved.config["configurable"]["thread_id"] async for saved in checkpointer.alist(None)}
+
+
+async def take_turns(registry: ConversationRegistry, *thread_ids: str) -> None:
+    for thread_id in thread_ids:
+        async with registry.turn(thread_id) as config:
+            await registry.checkpointer.aput({"configurable": {**config["configurable"], "checkpoint_ns": ""}}, empty_checkpoint(), {}, {})
+
+
+async def test_idle_threads_expire_even_if_this_process_never_saw_them(monkeypatch):
+    checkpointer, activity = InMemorySaver(), ThreadActivity()
+    await take_turns(ConversationRegistry(checkpointer, activity), "a", "b")
+    # A fresh registry on the same store, e.g. after a restart or in another web process.
+    registry = ConversationRegistry(checkpointer, activity, ttl=60)
+    assert await registry.evict() == 0
+    later(monkeypatch, 120)
+    async with registry.turn("b"):
+        assert await registry.evict() == 1
+    assert await saved_threads(checkpointer) == {"b"}
+    assert set(await activity.last_seen()) == {"b"}
+
+
+async def test_overflow_evicts_oldest_idle_threads(monkeypatch):
+    checkpointer, activity = InMemorySaver(), ThreadActivity()
+    registry = ConversationRegistry(checkpointer, activity, max_threads=2, ttl=3600, grace=30)
+    await take_turns(registry, "a", "b", "c")
+    later(monkeypatch, 1)
+    await take_turns(registry, "d")
+    # Within the grace period nothing is evicted: the thread may be in use by another process.
+    assert await registry.evict() == 0
+    later(monkeypatch, 60)
+    async with registry.turn("a"):
+        assert await registry.evict() == 2
+    assert await saved_threads(checkpointer) == {"a", "d"}
+
+
+def test_new_threads_are_unique():
+    assert ConversationRegistry.new_thread() != ConversationRegistry.new_thread()
+
+
+def test_trimmer_keeps_recent_turns_from_a_human_message():
+    messages = [
+        HumanMessage("первый вопрос " * 50, id="1"),
+        AIMessage("ответ " * 50, id="2"),
+        HumanMessage("второй вопрос", id="3"),
+        AIMessage("", id="4", tool_calls=[{"name": "tool", "args": {}, "id": "call"}]),
+        ToolMessage("результат", tool_call_id="call", id="5"),
+    ]
+    update = make_history_trimmer(max_tokens=100)({"messages": messages})
+    assert isinstance(update["messages"][0], RemoveMessage)
+    assert [message.id for message in update["messages"][1:]] == ["3", "4", "5"]
+
+
+def test_trimmer_leaves_short_history_alone():
+    messages = [HumanMessage("вопрос", id="1")]
+    assert make_history_trimmer(max_tokens=1000)({"messages": messages}) == {"llm_input_messages": messages}
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import update
+
+from app.config import SessionLocal
+from app.models import NotesMain
+from app.services import make_etag, etag_matches
+
+pytestmark = pytest.mark.anyio
+
+
+def test_etag_matches():
+    etag = make_etag(7)
+    assert etag_matches(etag, etag)
+    assert etag_matches('"notes-7"', etag)
+    assert etag_matches('W/"notes-1", W/"notes-7"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag(8), etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.parametrize("path", ["/", "/stats/count"])
+async def test_not_modified_until_a_write(client, make_notes, path):
+    await make_notes({"name": "a"})
+    response = await client.get(path)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = await client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    await make_notes({"name": "b"})
+    response = await client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_note_etag_never_pairs_with_a_stale_cached_body(client, make_notes):
+    [note] = await make_notes({"name": "before"})
+    response = await client.get(f"/{note['id']}")
+    etag = response.headers["etag"]
+
+    # Written behind the API's back: the cached note is not invalidated, the revision still moves.
+    with SessionLocal() as db:
+        db.execute(update(NotesMain).where(NotesMain.id == note["id"]).values(name="after"))
+        db.commit()
+
+    response = await client.get(f"/{note['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "after"
+    assert response.headers["etag"] != etag
+    response = await client.get(f"/{note['id']}", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
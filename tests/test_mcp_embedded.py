@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+
+import mcp_server
+from notes_embedded import EmbeddedNotesClient
+
+pytestmark = pytest.mark.anyio
+
+# (EmbeddedNotesClient method, its arguments, the same request over HTTP)
+REQUESTS = [
+    ("get_notes", [{"limit": 5000}], ("GET", "/", {"params": {"limit": 5000}})),
+    ("get_notes", [{"status_filter": ["done", "bogus"]}], ("GET", "/", {"params": {"status_filter": ["done", "bogus"]}})),
+    ("get_notes", [{"cursor": "xx"}], ("GET", "/", {"params": {"cursor": "xx"}})),
+    ("get_notes", [{"fields": "nope"}], ("GET", "/", {"params": {"fields": "nope"}})),
+    ("get_notes", [{"limit": 2, "cursor": ""}], ("GET", "/", {"params": {"limit": 2, "cursor": ""}})),
+    ("get_notes", [{"sort": "name", "order": "desc"}], ("GET", "/", {"params": {"sort": "name", "order": "desc"}})),
+    ("get_notes_stats", [], ("GET", "/stats", {})),
+    ("get_note", [999999], ("GET", "/999999", {})),
+    ("lookup_notes", [[], {}], ("POST", "/lookup", {"json": {"ids": []}})),
+    ("create_notes", [[{"status": "done"}]], ("POST", "/batch", {"json": {"items": [{"status": "done"}]}})),
+    ("update_note", [1, {"name": None}], ("PUT", "/1", {"json": {"name": None}})),
+    ("update_notes", [[{"id": 999999, "name": "x"}]], ("PATCH", "/batch", {"json": {"items": [{"id": 999999, "name": "x"}]}})),
+    ("delete_notes", [[999999]], ("DELETE", "/batch", {"json": {"ids": [999999]}})),
+]
+
+
+def without_input(body):
+    """Validation errors echo the raw input, which is a string in a query string and typed in-process."""
+    if isinstance(body, dict) and isinstance(body.get("detail"), list):
+        return {"detail": [{key: value for key, value in error.items() if key != "input"} for error in body["detail"]]}
+    return body
+
+
+@pytest.mark.parametrize("method, args, http", REQUESTS, ids=[f"{request[0]}-{i}" for i, request in enumerate(REQUESTS)])
+async def test_embedded_answers_like_the_api(client, make_notes, method, args, http):
+    await make_notes({"name": "b", "status": "done"}, {"name": "a"}, {"name": "c"})
+    http_method, path, kwargs = http
+    expected = await client.request(http_method, path, **kwargs)
+    async with EmbeddedNotesClient() as embedded:
+        response = await getattr(embedded, method)(*args)
+    assert response.status_code == expected.status_code
+    assert without_input(response.json()) == without_input(expected.json())
+
+
+async def call_tool(name: str, arguments: dict):
+    async with Client(mcp_server.mcp) as mcp_client:
+        result = await mcp_client.call_tool(name, arguments)
+    return result.content[0].text
+
+
+async def test_get_all_notes_walks_every_page(client, make_notes, monkeypatch):
+    monkeypatch.setattr(mcp_server, "FETCH_ALL_PAGE_SIZE", 2)
+    notes = await make_notes(*({"name": f"n{i}", "status": "done" if i % 2 else "in_progress"} for i in range(7)))
+
+    result = json.loads(await call_tool("Получение всех задач", {}))
+    assert [note["id"] for note in result["items"]] == [note["id"] for note in notes]
+    assert (result["total"], result["truncated"]) == (7, False)
+
+    result = json.loads(await call_tool("Получение всех задач", {"statuses": ["done"], "max_notes": 2}))
+    assert [note["name"] for note in result["items"]] == ["n1", "n3"]
+    assert (result["total"], result["truncated"]) == (3, True)
+
+
+async def test_get_all_notes_exact_fit_is_not_truncated(client, make_notes, monkeypatch):
+    monkeypatch.setattr(mcp_server, "FETCH_ALL_PAGE_SIZE", 2)
+    await make_notes(*({"name": f"n{i}"} for i in range(4)))
+    result = json.loads(await call_tool("Получение всех задач", {"max_notes": 4}))
+    assert (len(result["items"]), result["total"], result["truncated"]) == (4, 4, False)
+
+
+async def test_get_all_notes_walks_statuses_concurrently(client, make_notes, monkeypatch):
+    await make_notes(*({"name": f"n{i}", "status": status} for i, status in enumerate(["done", "in_progress", "not_activate"])))
+    get_notes = mcp_server.notes_api.get_notes
+    in_flight, most = 0, 0
+
+    async def counted_get_notes(params):
+        nonlocal in_flight, most
+        in_flight += 1
+        most = max(most, in_flight)
+        await asyncio.sleep(0.01)
+        try:
+            return await get_notes(params)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(mcp_server.notes_api, "get_notes", counted_get_notes)
+    result = json.loads(await call_tool("Получение всех задач", {}))
+    assert [note["name"] for note in result["items"]] == ["n0", "n1", "n2"]
+    assert most == 3
+
+
+async def test_tool_errors_are_returned_as_text(client):
+    text = await call_tool("Получение задачи по ID", {"note_id": 999999})
+    assert text.startswith("Ошибка")
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from mcp_pool import McpSessionPool
+
+pytestmark = pytest.mark.anyio
+
+
+def make_pool(size: int = 2) -> McpSessionPool:
+    return McpSessionPool({"transport": "stdio", "command": "true", "args": []}, size=size, connect_timeout=0.05)
+
+
+async def fail():
+    raise ConnectionError("transport closed")
+
+
+async def test_failed_call_marks_its_session_broken():
+    pool = make_pool(1)
+    slot = pool._slots[0]
+    session = object()
+    slot.session = session
+    with pytest.raises(ConnectionError):
+        await pool._call(slot, session, fail())
+    assert slot.broken.is_set()
+
+
+async def test_stale_call_does_not_break_a_reconnected_slot():
+    pool = make_pool(1)
+    slot = pool._slots[0]
+    old_session, new_session = object(), object()
+    slot.session = new_session
+    with pytest.raises(ConnectionError):
+        await pool._call(slot, old_session, fail())
+    assert not slot.broken.is_set()
+
+
+async def test_acquire_picks_least_loaded_live_session():
+    pool = make_pool(3)
+    busy, idle, dead = pool._slots
+    pool._set_session(busy, object())
+    pool._set_session(idle, object())
+    busy.in_flight = 2
+    slot, session = await pool._acquire()
+    assert slot is idle and session is idle.session
+    assert idle.in_flight == 1
+    assert dead.session is None
+
+
+async def test_acquire_waits_for_a_session_then_gives_up():
+    pool = make_pool(1)
+    with pytest.raises(ConnectionError):
+        await pool._acquire()
+
+    slot = pool._slots[0]
+    asyncio.get_running_loop().call_later(0.01, pool._set_session, slot, object())
+    acquired, _ = await pool._acquire()
+    assert acquired is slot
@@ -0,0 +1,76 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import MIGRATIONS, get_current_version, get_pending_migrations, apply_migrations
+
+# Migrations use PostgreSQL features; they run for real only against this (dedicated, empty) database.
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def test_versions_are_sequential():
+    assert [migration.VERSION for migration in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
+    assert all(migration.DESCRIPTION for migration in MIGRATIONS)
+
+
+def fake_migration(version: int):
+    def upgrade(conn):
+        conn.execute(text(f"CREATE TABLE t{version} (id INTEGER PRIMARY KEY)"))
+    return SimpleNamespace(VERSION=version, DESCRIPTION=f"table t{version}", upgrade=upgrade)
+
+
+def test_apply_only_pending(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    monkeypatch.setattr("app.migrations.runner.MIGRATIONS", [fake_migration(1), fake_migration(2)])
+    # Like app.main: every step on its own connection, apply_migrations opens the transaction.
+    with engine.connect() as conn:
+        assert get_current_version(conn) == 0
+    with engine.connect() as conn:
+        assert apply_migrations(conn) == [1, 2]
+
+    monkeypatch.setattr("app.migrations.runner.MIGRATIONS", [fake_migration(1), fake_migration(2), fake_migration(3)])
+    with engine.connect() as conn:
+        assert [migration.VERSION for migration in get_pending_migrations(conn)] == [3]
+    with engine.connect() as conn:
+        assert apply_migrations(conn) == [3]
+    with engine.connect() as conn:
+        assert apply_migrations(conn) == []
+    with engine.connect() as conn:
+        assert get_current_version(conn) == 3
+        assert {"t1", "t2", "t3"} <= set(inspect(conn).get_table_names())
+
+
+def test_failed_migration_rolls_back(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+    def broken(conn):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("app.migrations.runner.MIGRATIONS", [
+        fake_migration(1), SimpleNamespace(VERSION=2, DESCRIPTION="broken", upgrade=broken)
+    ])
+    with engine.connect() as conn:
+        with pytest.raises(RuntimeError):
+            apply_migrations(conn)
+    # The version of migration 1 is rolled back with the failed batch.
+    with engine.connect() as conn:
+        assert get_current_version(conn) == 0
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_postgres_migrations_apply_once():
+    engine = create_engine(TEST_POSTGRES_URL)
+    with engine.connect() as conn:
+        apply_migrations(conn)
+    with engine.connect() as conn:
+        assert apply_migrations(conn) == []
+    with engine.connect() as conn:
+        assert get_current_version(conn) == MIGRATIONS[-1].VERSION
+        columns = {column["name"] for column in inspect(conn).get_columns("notes_main")}
+        assert "search_vector" in columns
+        conn.execute(text("INSERT INTO notes_main (name, status) VALUES ('counted', 'done')"))
+        count = conn.execute(text("SELECT count FROM notes_status_counts WHERE status = 'done'")).scalar()
+        conn.rollback()
+    assert count >= 1
@@ -0,0 +1,125 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_get_update_delete(client):
+    response = await client.post("/", json={"name": "Первая", "description": "d"})
+    assert response.status_code == 201
+    note = response.json()
+    assert note["status"] == "in_progress"
+
+    response = await client.put(f"/{note['id']}", json={"status": "done"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+
+    response = await client.get(f"/{note['id']}", params={"fields": "name"})
+    assert response.json() == {"id": note["id"], "name": "Первая"}
+
+    assert (await client.delete(f"/{note['id']}")).status_code == 204
+    response = await client.get(f"/{note['id']}")
+    assert response.status_code == 404
+    assert response.json() == {"detail": f"Note with ID {note['id']} not found"}
+
+
+@pytest.mark.parametrize("field", ["name", "status"])
+async def test_update_rejects_null(client, make_notes, field):
+    [note] = await make_notes({"name": "n"})
+    response = await client.put(f"/{note['id']}", json={field: None})
+    assert response.status_code == 422
+
+
+async def test_list_filters_sort_and_fields(client, make_notes):
+    await make_notes(
+        {"name": "b", "status": "done"},
+        {"name": "a", "status": "in_progress"},
+        {"name": "c", "status": "not_activate"},
+        {"name": "ab", "status": "done"},
+    )
+    response = await client.get("/", params={"status_filter": ["done", "not_activate"], "sort": "name"})
+    assert [note["name"] for note in response.json()] == ["ab", "b", "c"]
+
+    response = await client.get("/", params={"name_prefix": "a", "fields": "name"})
+    assert [set(note) for note in response.json()] == [{"id", "name"}, {"id", "name"}]
+
+
+@pytest.mark.parametrize("params", [{"limit": 5000}, {"status_filter": "bogus"}, {"sort": "comment"}, {"fields": "nope"}])
+async def test_list_rejects_invalid_params(client, params):
+    assert (await client.get("/", params=params)).status_code == 422
+
+
+async def test_stats(client, make_notes):
+    await make_notes({"name": "a", "status": "done"}, {"name": "b"}, {"name": "c"})
+    response = await client.get("/stats")
+    assert response.json() == {"total_notes": 3, "by_status": {"done": 1, "in_progress": 2, "not_activate": 0}}
+    assert (await client.get("/stats/count")).json() == {"total_notes": 3}
+
+
+async def test_lookup(client, make_notes):
+    first, second = await make_notes({"name": "a"}, {"name": "b"})
+    response = await client.post(
+        "/lookup", params={"fields": "name"}, json={"ids": [second["id"], 999999, first["id"], second["id"]]}
+    )
+    assert response.json() == {
+        "items": [{"id": second["id"], "name": "b"}, {"id": first["id"], "name": "a"}],
+        "missing": [999999],
+    }
+
+
+async def test_batch_create_and_delete(client, make_notes):
+    notes = await make_notes(*({"name": f"n{i}"} for i in range(3)))
+    ids = [note["id"] for note in notes]
+    response = await client.request("DELETE", "/batch", json={"ids": [ids[0], 999999]})
+    assert [(result["id"], result["status"]) for result in response.json()["results"]] == [
+        (ids[0], "deleted"), (999999, "not_found")
+    ]
+    assert (await client.get("/stats/count")).json() == {"total_notes": 2}
+
+
+async def test_batch_update_merges_duplicate_ids(client, make_notes):
+    first, second = await make_notes({"name": "a", "comment": "keep"}, {"name": "b"})
+    response = await client.patch("/batch", json={"items": [
+        {"id": first["id"], "name": "a2"},
+        {"id": 999999, "name": "nope"},
+        {"id": first["id"], "status": "done"},
+        {"id": second["id"], "description": None},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(result["id"], result["status"]) for result in results] == [
+        (first["id"], "updated"), (999999, "not_found"), (first["id"], "updated"), (second["id"], "updated")
+    ]
+    assert results[0]["note"] == results[2]["note"] == {**first, "name": "a2", "status": "done"}
+    assert (await client.get(f"/{first['id']}")).json() == results[0]["note"]
+
+
+async def test_batch_create_validates_items(client):
+    response = await client.post("/batch", json={"items": [{"name": "ok"}, {"status": "done"}]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:3] == ["body", "items", 1]
+
+
+async def test_import_and_export_round_trip(client):
+    body = (
+        'id,name,description,comment,status\r\n'
+        '7,first,"two\r\nlines",,done\r\n'
+        ',second,,c,in_progress\r\n'
+        ',,,,done\r\n'
+    )
+    response = await client.post("/import", params={"format": "csv"}, content=body.encode())
+    summary = response.json()
+    assert (summary["accepted"], summary["rejected"]) == (2, 1)
+    assert summary["errors"][0]["line"] == 5
+
+    response = await client.get("/export", params={"format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [line for line in response.text.splitlines() if line]
+    assert len(exported) == 2
+    response = await client.get("/", params={"fields": "name,description"})
+    assert [note["description"] for note in response.json()] == ["two\nlines", None]
+
+
+async def test_import_ndjson_skips_invalid_lines(client):
+    body = '{"name": "ok"}\n{"name": "bad", "status": "nope"}\nnot json\n'
+    summary = (await client.post("/import", content=body.encode())).json()
+    assert (summary["accepted"], summary["rejected"]) == (1, 2)
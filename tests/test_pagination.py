@@ -0,0 +1,64 @@
+import pytest
+
+from app.services import Cursor, encode_cursor, decode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(Cursor(5))) == Cursor(5)
+    cursor = Cursor(5, "name", "desc", "задача")
+    assert decode_cursor(encode_cursor(cursor), "name", "desc") == cursor
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["xx", encode_cursor(Cursor(5, "name", "asc", "a"))])
+def test_cursor_rejects_invalid_or_foreign(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+async def walk(client, **params) -> tuple:
+    """Names from every page of the list following next_cursor, and the number of pages."""
+    names, cursor, pages = [], "", 0
+    while cursor is not None:
+        response = await client.get("/", params={**params, "cursor": cursor, "fields": "name"})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        names += [note["name"] for note in page["items"]]
+        cursor = page["next_cursor"]
+        pages += 1
+    return names, pages
+
+
+@pytest.mark.parametrize("sort, order", [("id", "asc"), ("name", "desc"), ("status", "asc")])
+async def test_cursor_walk_returns_every_note_once(client, make_notes, sort, order):
+    statuses = ("done", "in_progress", "not_activate")
+    notes = await make_notes(*({"name": f"note {i % 4}", "status": statuses[i % 3]} for i in range(11)))
+    names, pages = await walk(client, limit=3, sort=sort, order=order)
+    assert pages == 4
+    assert sorted(names) == sorted(note["name"] for note in notes)
+
+    response = await client.get("/", params={"limit": 100, "sort": sort, "order": order, "fields": "name"})
+    assert names == [note["name"] for note in response.json()]
+
+
+async def test_cursor_walk_with_filter(client, make_notes):
+    await make_notes(*({"name": f"n{i}", "status": "done" if i % 2 else "in_progress"} for i in range(6)))
+    names, _ = await walk(client, limit=2, status_filter="done")
+    assert names == ["n1", "n3", "n5"]
+
+
+async def test_cursor_survives_deleting_seen_notes(client, make_notes):
+    notes = await make_notes(*({"name": f"n{i}"} for i in range(4)))
+    page = (await client.get("/", params={"limit": 2, "cursor": ""})).json()
+    await client.request("DELETE", "/batch", json={"ids": [note["id"] for note in notes[:2]]})
+    page = (await client.get("/", params={"limit": 2, "cursor": page["next_cursor"]})).json()
+    assert [note["name"] for note in page["items"]] == ["n2", "n3"]
+    assert page["next_cursor"] is None
+
+
+async def test_invalid_cursor_is_bad_request(client):
+    assert (await client.get("/", params={"cursor": "xx"})).status_code == 400
+    cursor = encode_cursor(Cursor(1))
+    assert (await client.get("/", params={"cursor": cursor, "sort": "name"})).status_code == 400
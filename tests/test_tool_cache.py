@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from tool_cache import TurnToolCache, cacheable, memoize_tools, turn_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_tool(name: str, read_only: bool, calls: list, result=lambda note_id: "ok") -> StructuredTool:
+    async def run(note_id: int) -> str:
+        calls.append((name, note_id))
+        return result(note_id)
+    return StructuredTool.from_function(
+        coroutine=run, name=name, description=name, metadata={"readOnlyHint": True} if read_only else {}
+    )
+
+
+async def test_reads_are_cached_within_a_turn_and_writes_reset_the_cache():
+    calls = []
+    read, write = memoize_tools([make_tool("read", True, calls), make_tool("write", False, calls)])
+    with turn_cache() as cache:
+        await read.ainvoke({"note_id": 1})
+        await read.ainvoke({"note_id": 1})
+        await read.ainvoke({"note_id": 2})
+        await write.ainvoke({"note_id": 1})
+        await read.ainvoke({"note_id": 1})
+    assert calls == [("read", 1), ("read", 2), ("write", 1), ("read", 1)]
+    assert cache.hits == 1
+
+
+async def test_no_cache_outside_a_turn():
+    calls = []
+    [read] = memoize_tools([make_tool("read", True, calls)])
+    await read.ainvoke({"note_id": 1})
+    await read.ainvoke({"note_id": 1})
+    assert len(calls) == 2
+
+
+async def test_errors_are_not_cached():
+    calls = []
+    [read] = memoize_tools([make_tool("read", True, calls, result=lambda note_id: "Ошибка: нет задачи")])
+    with turn_cache():
+        await read.ainvoke({"note_id": 1})
+        await read.ainvoke({"note_id": 1})
+    assert len(calls) == 2
+    assert not cacheable(("Ошибка", None))
+    assert cacheable((["ok"], None))
+
+
+async def test_read_overlapping_a_write_is_not_cached():
+    cache = TurnToolCache()
+    write_started, read_done = asyncio.Event(), asyncio.Event()
+
+    async def slow_write():
+        write_started.set()
+        await read_done.wait()
+
+    async def read():
+        await write_started.wait()
+        return "before write"
+
+    write = asyncio.create_task(cache.write(slow_write))
+    assert await cache.read("key", read) == "before write"
+    read_done.set()
+    await write
+    assert await cache.read("key", lambda: asyncio.sleep(0, "after write")) == "after write"
@@ -0,0 +1,184 @@
+import zlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+COMPRESSED_SUFFIX = "+zlib"
+# Одна строка на тред: когда по нему последний раз шел ход
+THREAD_ACTIVITY_TABLE = (
+    "CREATE TABLE IF NOT EXISTS thread_last_seen "
+    "(thread_id TEXT PRIMARY KEY, seen_at DOUBLE PRECISION NOT NULL)"
+)
+THREAD_ACTIVITY_UPSERT = (
+    "INSERT INTO thread_last_seen (thread_id, seen_at) VALUES ({0}, {0}) "
+    "ON CONFLICT (thread_id) DO UPDATE SET seen_at = excluded.seen_at"
+)
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Сериализатор checkpoint'ов: msgpack из JsonPlusSerializer, крупные блобы сжимаются zlib
+
+    Сжатые значения помечаются суффиксом типа "+zlib", поэтому старые несжатые
+    записи читаются как раньше.
+    """
+
+    def __init__(self, serde: Optional[SerializerProtocol] = None, min_size: int = 512, level: int = 6):
+        self.serde = serde or JsonPlusSerializer()
+        self.min_size = min_size
+        self.level = level
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        return type_ + COMPRESSED_SUFFIX, zlib.compress(data, self.level)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(COMPRESSED_SUFFIX):
+            return self.serde.loads_typed((type_[:-len(COMPRESSED_SUFFIX)], zlib.decompress(payload)))
+        return self.serde.loads_typed(data)
+
+
+@asynccontextmanager
+async def open_checkpointer(
+    backend: str = "memory", url: Optional[str] = None, pool_size: int = 10
+) -> AsyncIterator[BaseCheckpointSaver]:
+    """Открывает checkpointer агента на время работы приложения
+
+    - memory: InMemorySaver, диалоги живут только в этом процессе
+    - sqlite: AsyncSqliteSaver, url - путь к файлу базы
+    - postgres: AsyncPostgresSaver на пуле соединений, url - строка подключения.
+      Общая база для нескольких процессов web за балансировщиком
+    """
+    serde = CompressedSerializer()
+    if backend == "memory":
+        yield InMemorySaver(serde=serde)
+    elif backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        async with aiosqlite.connect(url or "checkpoints.db") as conn:
+            saver = AsyncSqliteSaver(conn, serde=serde)
+            await saver.setup()
+            yield saver
+    elif backend == "postgres":
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        async with AsyncConnectionPool(
+            url,
+            max_size=pool_size,
+            open=False,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        ) as pool:
+            saver = AsyncPostgresSaver(pool, serde=serde)
+            await saver.setup()
+            yield saver
+    else:
+        raise ValueError(f"Unknown checkpointer backend: {backend}")
+
+
+class ThreadActivity:
+    """Время последнего хода каждого треда в памяти процесса (для checkpointer memory)"""
+
+    def __init__(self):
+        self.seen: Dict[str, float] = {}
+
+    async def touch(self, thread_id: str, seen_at: float) -> None:
+        self.seen[thread_id] = seen_at
+
+    async def last_seen(self) -> Dict[str, float]:
+        return dict(self.seen)
+
+    async def forget(self, thread_ids: Iterable[str]) -> None:
+        for thread_id in thread_ids:
+            self.seen.pop(thread_id, None)
+
+
+class SqliteThreadActivity(ThreadActivity):
+    """Время последнего хода тредов в таблице thread_last_seen файла SQLite"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def setup(self) -> None:
+        await self.conn.execute(THREAD_ACTIVITY_TABLE)
+        await self.conn.commit()
+
+    async def touch(self, thread_id: str, seen_at: float) -> None:
+        await self.conn.execute(THREAD_ACTIVITY_UPSERT.format("?"), (thread_id, seen_at))
+        await self.conn.commit()
+
+    async def last_seen(self) -> Dict[str, float]:
+        async with self.conn.execute("SELECT thread_id, seen_at FROM thread_last_seen") as cursor:
+            return {thread_id: seen_at for thread_id, seen_at in await cursor.fetchall()}
+
+    async def forget(self, thread_ids: Iterable[str]) -> None:
+        await self.conn.executemany(
+            "DELETE FROM thread_last_seen WHERE thread_id = ?", [(thread_id,) for thread_id in thread_ids]
+        )
+        await self.conn.commit()
+
+
+class PostgresThreadActivity(ThreadActivity):
+    """Время последнего хода тредов в таблице thread_last_seen, общей для всех процессов web"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def setup(self) -> None:
+        async with self.pool.connection() as conn:
+            await conn.execute(THREAD_ACTIVITY_TABLE)
+
+    async def touch(self, thread_id: str, seen_at: float) -> None:
+        async with self.pool.connection() as conn:
+            await conn.execute(THREAD_ACTIVITY_UPSERT.format("%s"), (thread_id, seen_at))
+
+    async def last_seen(self) -> Dict[str, float]:
+        async with self.pool.connection() as conn:
+            cursor = await conn.execute("SELECT thread_id, seen_at FROM thread_last_seen")
+            return {thread_id: seen_at for thread_id, seen_at in await cursor.fetchall()}
+
+    async def forget(self, thread_ids: Iterable[str]) -> None:
+        async with self.pool.connection() as conn:
+            await conn.execute("DELETE FROM thread_last_seen WHERE thread_id = ANY(%s)", (list(thread_ids),))
+
+
+@asynccontextmanager
+async def open_thread_activity(backend: str = "memory", url: Optional[str] = None) -> AsyncIterator[ThreadActivity]:
+    """Открывает учет последних ходов тредов в том же хранилище, что и checkpointer
+
+    По нему вытесняются простаивающие треды: с sqlite/postgres он общий для
+    процессов web и переживает рестарт. Это небольшая таблица с одной строкой
+    на тред, поэтому проверка не сканирует сами checkpoint'ы.
+    """
+    if backend == "memory":
+        yield ThreadActivity()
+    elif backend == "sqlite":
+        import aiosqlite
+
+        async with aiosqlite.connect(url or "checkpoints.db") as conn:
+            activity = SqliteThreadActivity(conn)
+            await activity.setup()
+            yield activity
+    elif backend == "postgres":
+        from psycopg_pool import AsyncConnectionPool
+
+        async with AsyncConnectionPool(url, min_size=1, max_size=2, open=False, kwargs={"autocommit": True}) as pool:
+            activity = PostgresThreadActivity(pool)
+            await activity.setup()
+            yield activity
+    else:
+        raise ValueError(f"Unknown checkpointer backend: {backend}")
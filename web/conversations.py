@@ -0,0 +1,125 @@
+import asyncio
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from checkpoints import ThreadActivity
+
+
+class ConversationRegistry:
+    """Треды агента по клиентам с вытеснением из checkpointer
+
+    Каждый клиент получает свой thread_id. Каждый ход записывает свое время в
+    activity (учет последних ходов в хранилище checkpointer'а), поэтому несколько
+    процессов web с общим хранилищем видят одно и то же, а после рестарта старые
+    треды тоже вытесняются. Тред, не обновлявшийся дольше ttl секунд, и самые
+    старые треды сверх max_threads удаляются. Сверх лимита
+    вытесняются только треды, простаивающие дольше grace секунд: так не
+    удаляется тред, по которому идет ход в другом процессе. Тред, по которому
+    сейчас идет ответ агента в этом процессе, не вытесняется никогда.
+    """
+
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        activity: ThreadActivity,
+        max_threads: int = 200,
+        ttl: float = 3600.0,
+        grace: float = 600.0,
+    ):
+        self.checkpointer = checkpointer
+        self.activity = activity
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.grace = min(grace, ttl)
+        self._active: Counter = Counter()
+
+    @staticmethod
+    def new_thread() -> str:
+        """Новый thread_id для клиента; в хранилище тред появится с первым ходом"""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    @asynccontextmanager
+    async def turn(self, thread_id: str) -> AsyncIterator[dict]:
+        """Один ход диалога: пока он идет, тред не вытесняется. Время хода записывается в начале и в конце"""
+        self._active[thread_id] += 1
+        try:
+            await self.activity.touch(thread_id, time.time())
+            yield self.config(thread_id)
+        finally:
+            self._active[thread_id] -= 1
+            if not self._active[thread_id]:
+                del self._active[thread_id]
+            await self.activity.touch(thread_id, time.time())
+
+    async def evict(self) -> int:
+        """Удаляет треды старше ttl и самые старые сверх max_threads. Возвращает число удаленных"""
+        updated = await self.activity.last_seen()
+        now = time.time()
+        # От давно обновлявшихся к недавним
+        idle = sorted(
+            (last_update, thread_id) for thread_id, last_update in updated.items()
+            if thread_id not in self._active
+        )
+        overflow = max(0, len(updated) - self.max_threads)
+        evicted = [
+            thread_id for index, (last_update, thread_id) in enumerate(idle)
+            if last_update < now - self.ttl or (index < overflow and last_update < now - self.grace)
+        ]
+        for thread_id in evicted:
+            await self.checkpointer.adelete_thread(thread_id)
+        await self.activity.forget(evicted)
+        return len(evicted)
+
+    async def run_eviction(self, interval: float = 60.0) -> None:
+        """Фоновая задача: периодически вытесняет простаивающие треды"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict()
+            except Exception as e:
+                print(f"Ошибка при вытеснении тредов: {e}")
+
+
+def make_history_trimmer(max_tokens: int):
+    """pre_model_hook для агента: обрезает историю треда под бюджет токенов
+
+    Остаются последние сообщения, начиная с сообщения пользователя, так что вызовы
+    инструментов не отрываются от своих результатов. Обрезанная история записывается
+    в состояние, поэтому и промпт, и память треда не растут с длиной диалога.
+    """
+
+    def trim_history(state) -> dict:
+        messages: List[AnyMessage] = state["messages"]
+        trimmed = trim_messages(
+            messages,
+            strategy="last",
+            token_counter=count_tokens_approximately,
+            max_tokens=max_tokens,
+            start_on="human",
+            end_on=("human", "tool"),
+            include_system=True,
+        )
+        if not trimmed:
+            # Текущий ход сам по себе больше бюджета - оставляем хотя бы его
+            last_human = max(
+                (i for i, message in enumerate(messages) if isinstance(message, HumanMessage)),
+                default=0,
+            )
+            trimmed = messages[last_human:]
+        if len(trimmed) == len(messages):
+            return {"llm_input_messages": messages}
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *trimmed]}
+
+    return trim_history
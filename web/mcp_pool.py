@@ -0,0 +1,178 @@
+import asyncio
+import random
+from datetime import timedelta
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import Connection, create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CallToolResult, ListToolsResult
+
+
+class PooledSession:
+    """Одна сессия пула: текущее соединение и лимит одновременных вызовов"""
+
+    def __init__(self, index: int, max_concurrency: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.limit = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.failures = 0
+        # Вызов через сессию упал на транспорте - пора переподключиться, не дожидаясь пинга
+        self.broken = asyncio.Event()
+
+
+class McpSessionPool:
+    """Пул сессий MCP клиента, общий для всех пользователей чата
+
+    Каждую сессию держит своя фоновая задача: открывает соединение, раз в
+    health_interval секунд проверяет его пингом и переподключается с
+    экспоненциальной задержкой, если пинг или вызов упал. Вызов инструмента
+    уходит в наименее загруженную живую сессию, на одной сессии одновременно
+    выполняется не больше max_concurrency вызовов.
+
+    Пул сам реализует list_tools и call_tool, поэтому инструменты LangChain
+    загружаются через load_mcp_tools один раз и работают поверх всего пула.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        size: int = 4,
+        max_concurrency: int = 8,
+        call_timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        health_interval: float = 30.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.connection = connection
+        self.call_timeout = call_timeout
+        self.connect_timeout = connect_timeout
+        self.health_interval = health_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = [PooledSession(index, max_concurrency) for index in range(size)]
+        self._available = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._tools: Optional[List[BaseTool]] = None
+        self._tools_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "McpSessionPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Запускает фоновые задачи сессий; соединения открываются асинхронно"""
+        self._tasks = [
+            asyncio.create_task(self._supervise(slot), name=f"mcp_session_{slot.index}")
+            for slot in self._slots
+        ]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def healthy(self) -> int:
+        """Сколько сессий сейчас подключено"""
+        return sum(slot.session is not None for slot in self._slots)
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Инструменты MCP сервера; загружаются один раз и общие для всех сессий"""
+        if self._tools is None:
+            async with self._tools_lock:
+                if self._tools is None:
+                    self._tools = await load_mcp_tools(self)
+        return self._tools
+
+    async def list_tools(self, cursor: Optional[str] = None) -> ListToolsResult:
+        slot, session = await self._acquire()
+        try:
+            async with slot.limit:
+                return await self._call(slot, session, session.list_tools(cursor=cursor))
+        finally:
+            slot.in_flight -= 1
+
+    async def call_tool(self, name: str, arguments: Optional[dict[str, Any]] = None) -> CallToolResult:
+        slot, session = await self._acquire()
+        try:
+            async with slot.limit:
+                return await self._call(slot, session, session.call_tool(
+                    name, arguments, read_timeout_seconds=timedelta(seconds=self.call_timeout)
+                ))
+        finally:
+            slot.in_flight -= 1
+
+    async def _call(self, slot: PooledSession, session: ClientSession, request):
+        try:
+            return await request
+        except McpError:
+            # Ошибку вернул сервер (или истек таймаут запроса) - соединение при этом живое
+            raise
+        except Exception:
+            # Сессия могла уже смениться: старый вызов не должен ронять новое соединение
+            if slot.session is session:
+                slot.broken.set()
+            raise
+
+    async def _acquire(self) -> Tuple[PooledSession, ClientSession]:
+        """Наименее загруженная живая сессия; ждет переподключения не дольше connect_timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.connect_timeout
+        while True:
+            alive = [slot for slot in self._slots if slot.session is not None]
+            if alive:
+                slot = min(alive, key=lambda slot: slot.in_flight)
+                slot.in_flight += 1
+                return slot, slot.session
+            try:
+                await asyncio.wait_for(self._available.wait(), deadline - loop.time())
+            except TimeoutError:
+                raise ConnectionError("MCP сервер недоступен: нет ни одной живой сессии") from None
+
+    def _set_session(self, slot: PooledSession, session: Optional[ClientSession]) -> None:
+        slot.session = session
+        if self.healthy:
+            self._available.set()
+        else:
+            self._available.clear()
+
+    async def _supervise(self, slot: PooledSession) -> None:
+        """Держит сессию открытой: подключение, проверки здоровья, переподключение с задержкой"""
+        while True:
+            try:
+                async with create_session(self.connection) as session:
+                    await asyncio.wait_for(session.initialize(), self.connect_timeout)
+                    slot.failures = 0
+                    slot.broken.clear()
+                    self._set_session(slot, session)
+                    await self._watch(slot, session)
+                error = "соединение закрыто"
+            except Exception as e:
+                error = repr(e)
+            finally:
+                self._set_session(slot, None)
+
+            slot.failures += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (slot.failures - 1))
+            delay *= random.uniform(0.5, 1.0)
+            print(f"MCP сессия {slot.index} недоступна ({error}), повтор через {delay:.1f} с")
+            await asyncio.sleep(delay)
+
+    async def _watch(self, slot: PooledSession, session: ClientSession) -> None:
+        """Возвращается, когда сессию пора переоткрыть: упал вызов или пинг"""
+        while True:
+            try:
+                await asyncio.wait_for(slot.broken.wait(), self.health_interval)
+                return
+            except TimeoutError:
+                pass
+            await asyncio.wait_for(session.send_ping(), self.connect_timeout)
@@ -0,0 +1,99 @@
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+# Инструменты MCP сервера возвращают ошибки текстом, такие ответы не кэшируются
+ERROR_PREFIX = "Ошибка"
+
+
+class TurnToolCache:
+    """Результаты инструментов чтения в пределах одного хода агента
+
+    Повторный вызов с теми же аргументами отдается из кэша. Любой инструмент
+    записи сбрасывает кэш; ответ чтения, начатого до или во время записи,
+    в кэш не попадает.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, Any] = {}
+        self._generation = 0
+        self._writes = 0
+        self.hits = 0
+
+    @staticmethod
+    def key(name: str, arguments: dict) -> str:
+        return name + json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)
+
+    async def read(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        generation = self._generation
+        result = await call()
+        if generation == self._generation and not self._writes and cacheable(result):
+            self._results[key] = result
+        return result
+
+    async def write(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        self._writes += 1
+        self._results.clear()
+        try:
+            return await call()
+        finally:
+            self._writes -= 1
+            self._generation += 1
+            self._results.clear()
+
+
+_current: ContextVar[Optional[TurnToolCache]] = ContextVar("turn_tool_cache", default=None)
+
+
+@contextmanager
+def turn_cache() -> Iterator[TurnToolCache]:
+    """Включает кэш инструментов на время хода; задачи, запущенные внутри, видят тот же кэш"""
+    cache = TurnToolCache()
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+
+
+def cacheable(result: Any) -> bool:
+    # У инструментов MCP ответ - пара (content, artifact)
+    content = result[0] if isinstance(result, tuple) else result
+    if isinstance(content, list):
+        content = content[0] if content else ""
+    return not (isinstance(content, str) and content.startswith(ERROR_PREFIX))
+
+
+def is_read_only(tool: BaseTool) -> bool:
+    """Инструмент только читает данные: сервер пометил его readOnlyHint"""
+    return bool((tool.metadata or {}).get("readOnlyHint"))
+
+
+def memoize_tools(tools: List[BaseTool]) -> List[BaseTool]:
+    """Оборачивает инструменты MCP кэшем хода
+
+    Инструменты с readOnlyHint читают через кэш, остальные считаются
+    записью и сбрасывают его. Вне turn_cache() вызовы идут напрямую.
+    """
+    return [memoize_tool(tool) if isinstance(tool, StructuredTool) and tool.coroutine else tool for tool in tools]
+
+
+def memoize_tool(tool: StructuredTool) -> StructuredTool:
+    coroutine = tool.coroutine
+    read_only = is_read_only(tool)
+
+    async def call_tool(**arguments):
+        cache = _current.get()
+        if cache is None:
+            return await coroutine(**arguments)
+        if read_only:
+            return await cache.read(TurnToolCache.key(tool.name, arguments), lambda: coroutine(**arguments))
+        return await cache.write(lambda: coroutine(**arguments))
+
+    return tool.model_copy(update={"coroutine": call_tool})
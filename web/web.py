@@ -1,12 +1,16 @@
 import os
 import asyncio
+import time
+from contextlib import AsyncExitStack
 from dotenv import find_dotenv, load_dotenv
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.tools import load_mcp_tools
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.prebuilt import create_react_agent
-from nicegui import ui, app
+from nicegui import background_tasks, ui, app
+from checkpoints import open_checkpointer, open_thread_activity
+from conversations import ConversationRegistry, make_history_trimmer
+from mcp_pool import McpSessionPool
+from tool_cache import memoize_tools, turn_cache
 
 
 
@@ -23,18 +27,29 @@ model = ChatOpenAI(
 
 
 
-checkpointer = InMemorySaver()
 template = "Ты - личный помощник, который умеет управлять задачами через MCP"
-config = {"configurable": {"thread_id": "1"}}
+# Где хранятся диалоги: memory (только в этом процессе), sqlite или postgres (переживают рестарт,
+# postgres можно делить между несколькими процессами web за балансировщиком)
+CHECKPOINTER_BACKEND = os.getenv("WEB_CHECKPOINTER", "memory")
+CHECKPOINTER_URL = os.getenv("WEB_CHECKPOINTER_URL")
+# Секрет для cookie браузера. Если задан, диалог привязан к браузеру, а не к вкладке,
+# и восстанавливается после перезагрузки страницы
+STORAGE_SECRET = os.getenv("WEB_STORAGE_SECRET")
+# Бюджет токенов истории, которая уходит в модель на каждом шаге
+HISTORY_TOKEN_BUDGET = int(os.getenv("WEB_HISTORY_TOKEN_BUDGET", "6000"))
+# Как часто перерисовывать markdown при стриминге ответа, в секундах
+STREAM_RENDER_INTERVAL = 0.05
 
 
 
 # Глобальные переменные для агента
 agent = None
-client = None
-session = None
-input_field = None
-chat_container = None
+checkpointer = None
+conversations = None
+mcp_pool = None
+resources = AsyncExitStack()
+# Одна инициализация агента на всех клиентов, которые пишут, пока его нет
+agent_lock = asyncio.Lock()
 
 
 
@@ -206,28 +221,20 @@ def add_custom_styles():
 
 
 async def initialize_agent():
-    """Инициализация MCP клиента и агента"""
-    global agent, client, session
+    """Инициализация агента поверх пула MCP сессий"""
+    global agent
     
     try:
-        client = MultiServerMCPClient(
-            {
-                "temp": {
-                    "url": f"http://{os.getenv('MCP_SERVICE_NAME')}:8000/mcp",
-                    "transport": "streamable_http",
-                }
-            }
-        )
-        
-        session = client.session("temp")
-        session_obj = await session.__aenter__()
-        tools = await load_mcp_tools(session_obj)
+        # Инструменты загружаются один раз, вызовы расходятся по сессиям пула.
+        # Повторные чтения в пределах хода отдаются из кэша, запись его сбрасывает
+        tools = memoize_tools(await mcp_pool.get_tools())
         
         agent = create_react_agent(
             model,
             tools,
             prompt=template,
             checkpointer=checkpointer,
+            pre_model_hook=make_history_trimmer(HISTORY_TOKEN_BUDGET),
         )
         
         print("Агент успешно инициализирован")
@@ -238,22 +245,15 @@ async def initialize_agent():
         return False
 
 
-
-async def cleanup_agent():
-    """Очистка ресурсов"""
-    global session, client
-    
-    try:
-        if session:
-            await session.__aexit__(None, None, None)
-        if client:
-            await client.close()
-    except Exception as e:
-        print(f"Ошибка при очистке: {e}")
+async def ensure_agent():
+    """Поднимает агента, если его еще нет. Одновременные вызовы ждут одну инициализацию"""
+    async with agent_lock:
+        # Пока ждали, агента мог поднять другой клиент
+        return agent is not None or await initialize_agent()
 
 
 
-def add_user_message(message_text):
+def add_user_message(chat_container, message_text):
     """Добавление сообщения пользователя в чат"""
     with chat_container:
         with ui.row().classes('w-full mb-3 justify-end'):
@@ -263,29 +263,113 @@ def add_user_message(message_text):
 
 
 
-def add_assistant_message(message_text):
+def add_assistant_message(chat_container, message_text):
     """Добавление сообщения ассистента с поддержкой Markdown"""
     with chat_container:
         with ui.row().classes('w-full mb-3 justify-start'):
             with ui.card().classes('assistant-message p-4 max-w-md shadow-lg'):
-                ui.markdown(message_text).classes('text-sm markdown-content text-gray-100')
+                markdown = ui.markdown(message_text).classes('text-sm markdown-content text-gray-100')
                 ui.label('🤖 Нейро-Ассистент').classes('text-xs mt-2 font-light').style('color: var(--neural-orange)')
+    return markdown
 
 
 
-def add_system_message(message_text):
-    """Добавление системного сообщения"""
+def add_streaming_message(chat_container):
+    """Добавление пустого сообщения ассистента, которое заполняется по мере стриминга"""
     with chat_container:
-        with ui.row().classes('w-full mb-3 justify-center'):
-            with ui.card().classes('system-message p-3 loading-indicator'):
-                ui.label(message_text).classes('text-xs font-medium text-gray-900')
+        with ui.row().classes('w-full mb-3 justify-start'):
+            with ui.card().classes('assistant-message p-4 max-w-md shadow-lg'):
+                markdown = ui.markdown('').classes('text-sm markdown-content text-gray-100')
+                tool_status = ui.label('').classes('text-xs mt-2 font-light loading-indicator').style('color: var(--text-secondary)')
+                ui.label('🤖 Нейро-Ассистент').classes('text-xs mt-2 font-light').style('color: var(--neural-orange)')
+    return markdown, tool_status
 
 
 
-async def send_message(message_text):
+def add_system_message(chat_container, message_text):
+    """Добавление системного сообщения"""
+    with chat_container:
+        with ui.row().classes('w-full mb-3 justify-center') as row:
+            with ui.card().classes('system-message p-3 loading-indicator'):
+                ui.label(message_text).classes('text-xs font-medium text-gray-900')
+    return row
+
+
+
+def chunk_text(content):
+    """Текст из content чанка: строка или список блоков"""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+        if not isinstance(block, dict) or block.get("type") == "text"
+    )
+
+
+
+async def stream_agent_reply(chat_container, thread_id, message_text, loading_indicator):
+    """Стримит ответ агента в чат: токены модели и ход вызова инструментов"""
+    markdown = None
+    tool_status = None
+    text = ""
+    message_id = None
+    last_render = 0.0
+
+    # Кэш инструментов живет один ход: задачи агента видят его через contextvar
+    with turn_cache():
+        async with conversations.turn(thread_id) as config:
+            async for chunk, metadata in agent.astream(
+                {"messages": [{"role": "user", "content": message_text}]},
+                config,
+                stream_mode="messages",
+                # Один checkpoint на весь ход вместо записи после каждого шага ReAct
+                checkpoint_during=False,
+            ):
+                # Первый чанк: убираем индикатор загрузки и открываем сообщение ассистента
+                if markdown is None:
+                    loading_indicator.delete()
+                    markdown, tool_status = add_streaming_message(chat_container)
+
+                # Сообщения, которые переписывает pre_model_hook при обрезке истории, не показываем
+                if metadata.get("langgraph_node") not in ("agent", "tools"):
+                    continue
+                if isinstance(chunk, ToolMessage):
+                    tool_status.text = f"✅ Инструмент «{chunk.name}» выполнен"
+                    continue
+                if not isinstance(chunk, AIMessageChunk):
+                    continue
+
+                for tool_call in chunk.tool_call_chunks:
+                    if tool_call.get("name"):
+                        tool_status.text = f"🔧 Вызываю инструмент «{tool_call['name']}»..."
+
+                token = chunk_text(chunk.content)
+                if not token:
+                    continue
+                # Новое сообщение модели после вызова инструментов - с новой строки
+                if chunk.id != message_id:
+                    if text:
+                        text += "\n\n"
+                    message_id = chunk.id
+                text += token
+
+                # Markdown перерисовывается не чаще STREAM_RENDER_INTERVAL, чтобы не заваливать websocket
+                now = time.monotonic()
+                if now - last_render >= STREAM_RENDER_INTERVAL:
+                    markdown.set_content(text)
+                    last_render = now
+
+    if markdown is None:
+        loading_indicator.delete()
+        markdown, tool_status = add_streaming_message(chat_container)
+    markdown.set_content(text or "_Пустой ответ_")
+    tool_status.set_visibility(False)
+
+
+
+async def send_message(chat_container, thread_id, message_text):
     """Обработка отправки сообщения"""
-    global chat_container
-    
     print(f"send_message вызвана с текстом: '{message_text}'")
     
     if not chat_container:
@@ -299,61 +383,98 @@ async def send_message(message_text):
     print(f"Отправляем сообщение: {message_text}")
     
     # Добавляем сообщение пользователя
-    add_user_message(message_text)
+    add_user_message(chat_container, message_text)
     
-    # Показываем индикатор загрузки
-    add_system_message("🧠 Обрабатываю нейронные связи...")
+    # Показываем индикатор загрузки до первого токена
+    loading_indicator = add_system_message(chat_container, "🧠 Обрабатываю нейронные связи...")
     
     try:
-        # Получаем ответ от агента
-        if agent:
-            response = await agent.ainvoke(
-                {"messages": [{"role": "user", "content": message_text}]}, 
-                config
-            )
-            
-            # Удаляем последнее системное сообщение (индикатор загрузки)
-            if chat_container.default_slot.children:
-                chat_container.default_slot.children[-1].delete()
-            
-            # Извлекаем текст ответа
-            assistant_message = response['messages'][-1].content
-            
-            # Добавляем ответ ассистента с поддержкой Markdown
-            add_assistant_message(assistant_message)
-            
+        # Если MCP сервер был недоступен при старте, пробуем поднять агента снова
+        if agent or await ensure_agent():
+            # Ответ появляется по токенам, вызовы инструментов видны по ходу работы
+            await stream_agent_reply(chat_container, thread_id, message_text, loading_indicator)
         else:
-            # Удаляем индикатор загрузки
-            if chat_container.default_slot.children:
-                chat_container.default_slot.children[-1].delete()
-            add_system_message("⚠️ Ошибка: нейронная сеть не активна")
+            loading_indicator.delete()
+            add_system_message(chat_container, "⚠️ Ошибка: нейронная сеть не активна")
                 
     except Exception as e:
-        # Удаляем индикатор загрузки
-        if chat_container.default_slot.children:
-            chat_container.default_slot.children[-1].delete()
-        add_system_message(f"❌ Ошибка нейронной обработки: {str(e)}")
+        # Удаляем индикатор загрузки, если ответ так и не начался
+        if not loading_indicator.is_deleted:
+            loading_indicator.delete()
+        add_system_message(chat_container, f"❌ Ошибка нейронной обработки: {str(e)}")
 
 
 
 # Инициализация при старте приложения
 @app.on_startup
 async def startup():
-    await initialize_agent()
+    global checkpointer, conversations, mcp_pool
+    checkpointer = await resources.enter_async_context(
+        open_checkpointer(CHECKPOINTER_BACKEND, CHECKPOINTER_URL)
+    )
+    thread_activity = await resources.enter_async_context(
+        open_thread_activity(CHECKPOINTER_BACKEND, CHECKPOINTER_URL)
+    )
+    # У каждого клиента свой тред; простаивающие треды вытесняются из checkpointer
+    conversations = ConversationRegistry(
+        checkpointer,
+        thread_activity,
+        max_threads=int(os.getenv("WEB_MAX_THREADS", "200")),
+        ttl=float(os.getenv("WEB_THREAD_TTL", "3600")),
+        grace=float(os.getenv("WEB_THREAD_GRACE", "600")),
+    )
+    # Пул сессий к MCP серверу: проверка здоровья и переподключение с задержкой
+    mcp_pool = await resources.enter_async_context(McpSessionPool(
+        {
+            "url": f"http://{os.getenv('MCP_SERVICE_NAME')}:8000/mcp",
+            "transport": "streamable_http",
+        },
+        size=int(os.getenv("WEB_MCP_POOL_SIZE", "4")),
+        max_concurrency=int(os.getenv("WEB_MCP_SESSION_CONCURRENCY", "8")),
+        call_timeout=float(os.getenv("WEB_MCP_CALL_TIMEOUT", "60")),
+        health_interval=float(os.getenv("WEB_MCP_HEALTH_INTERVAL", "30")),
+    ))
+    await ensure_agent()
+    background_tasks.create(conversations.run_eviction(), name="evict_idle_threads")
 
 
 
 # Очистка при завершении
 @app.on_shutdown
 async def shutdown():
-    await cleanup_agent()
+    await resources.aclose()
+
+
+
+def client_thread_id():
+    """thread_id клиента: из cookie браузера, если задан WEB_STORAGE_SECRET, иначе новый для каждой вкладки"""
+    if not STORAGE_SECRET:
+        return conversations.new_thread()
+    thread_id = app.storage.browser.get("thread_id")
+    if thread_id is None:
+        thread_id = conversations.new_thread()
+        app.storage.browser["thread_id"] = thread_id
+    return thread_id
+
+
+
+async def render_history(chat_container, thread_id):
+    """Показывает сохраненную историю треда (например, после перезагрузки страницы)"""
+    if not agent:
+        return
+    state = await agent.aget_state(conversations.config(thread_id))
+    for message in state.values.get("messages", []):
+        if isinstance(message, HumanMessage):
+            add_user_message(chat_container, chunk_text(message.content))
+        elif isinstance(message, AIMessage) and chunk_text(message.content):
+            add_assistant_message(chat_container, chunk_text(message.content))
 
 
 
 @ui.page('/')
-def main():
+async def main():
     """Главная страница приложения"""
-    global input_field, chat_container
+    thread_id = client_thread_id()
     
     # Добавляем кастомные стили
     add_custom_styles()
@@ -394,6 +515,7 @@ def main():
             
             # Приветственное сообщение в стиле Deep Learning
             add_assistant_message(
+                chat_container,
                 "🚀 **Добро пожаловать в Deep Learning Assistant!**\n\n"
                 "Я - **нейронный помощник**, обученный на принципах глубокого обучения.\n\n"
                 "**Мои возможности:**\n"
@@ -404,6 +526,7 @@ def main():
                 "> *\"Глубокое обучение - это не просто алгоритм, это способ мышления\"*\n\n"
                 "**Готов помочь вам в исследовании мира ИИ! 🤖**"
             )
+            await render_history(chat_container, thread_id)
             
         # Поле ввода и кнопка отправки с улучшенным дизайном
         def handle_send():
@@ -415,7 +538,7 @@ def main():
                 # Очищаем поле сразу
                 input_field.value = ''
                 # Отправляем сообщение
-                asyncio.create_task(send_message(message_text))
+                asyncio.create_task(send_message(chat_container, thread_id, message_text))
             else:
                 print("Пустое сообщение в handle_send")
         
@@ -439,4 +562,4 @@ def main():
 
 # Запуск приложения
 if __name__ in {"__main__", "__mp_main__"}:
-    ui.run(host='0.0.0.0', port=8080, reload=False)
+    ui.run(host='0.0.0.0', port=8080, reload=False, storage_secret=STORAGE_SECRET)